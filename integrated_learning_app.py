@@ -1,13 +1,21 @@
 """
 integrated_learning_app.py (v3.6 - 単語・例文統合学習アプリ - Google翻訳ボタン追加版 完全版)
 """
-import json, os, re, random, sqlite3, sys, tkinter as tk, shutil, subprocess
-from tkinter import ttk, messagebox
+import json, os, re, random, sqlite3, sys, tkinter as tk, shutil, subprocess, csv, html, gzip
+from tkinter import ttk, messagebox, filedialog
 from datetime import datetime, timedelta
 import traceback
+import argparse
 import threading
 import asyncio
 import ctypes
+import hashlib
+import tempfile
+import itertools
+import unicodedata
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from collections import OrderedDict, deque, namedtuple
 
 # --- ライブラリのインポート ---
 try:
@@ -42,18 +50,1319 @@ except ImportError:
 APP_TITLE = "統合学習アプリ (単語・例文・クイズ) v3.6"
 CONFIG_FILE = "integrated_config.json"
 DEFAULT_DB_FILE = "learning.sqlite3"
-AUDIO_FILE_PATH = os.path.join(os.path.abspath(os.path.dirname(__file__)), "temp_speech.mp3")
 TTS_VOICE = "en-US-JennyNeural"
+TTS_RATE = "+0%"
+TTS_CACHE_DIR = os.path.join(os.path.abspath(os.path.dirname(__file__)), "tts_cache")
+TTS_CACHE_MAX_BYTES = 200 * 1024 * 1024  # 音声キャッシュの上限（200MB）
+TTS_MEMORY_CACHE_BYTES = 16 * 1024 * 1024  # メモリ上に保持する音声の上限（16MB）
+TTS_PREFETCH_AHEAD = 3        # 先読みする問題数
+TTS_SYNTH_CONCURRENCY = 4     # 通常再生・先読みの同時合成数
+TTS_PRERENDER_CONCURRENCY = 8  # 一括作成の同時合成数
 SOUND_FILES = {
     "correct": "sound_correct.mp3",
     "incorrect": "sound_incorrect.mp3"
 }
+TRANSLATION_TIMEOUT_MS = 15000  # 翻訳の待ち時間の上限
+TRANSLATION_NETWORK_TIMEOUT = 10  # 翻訳APIの1回の通信の待ち時間の上限（秒）。上の値より短くしてワーカーを早く空ける
+DEEPL_BATCH_MAX_TEXTS = 50          # DeepL の1リクエストに含められるテキスト数の上限
+DEEPL_BATCH_MAX_BYTES = 100 * 1024  # 1リクエストの本文サイズ（上限128KiBに余裕を持たせる）
+AUDIO_BACKEND_DEFAULT = "auto"  # "auto" / "mci" / "subprocess" / "null"
+
+DUMMY_CHOICES = ["該当なし", "不明", "その他", "関連語なし"]  # 選択肢が足りないときの埋め草
+SIMILAR_CANDIDATES = 12       # 難しい選択肢で1問あたりに用意する似た単語の数
+SIMILAR_MAX_POSTINGS = 300    # これより多くの単語に現れる n-gram はありふれているので類似度に使わない
+WORD_GRAMS_INLINE_LIMIT = 500  # 未反映の単語がこの数以下なら n-gram 索引をその場で更新（多いときはバックグラウンドで作る）
+WORD_GRAMS_CHUNK_PAUSE = 0.03  # バックグラウンドで作るとき、チャンクの間に空ける秒数（画面からの保存を待たせない）
+SAMPLE_DRAWS_PER_ROW = 8  # 無作為抽出で1件あたりに引く乱数候補の上限（超えたらインデックスから選び直す）
+LIST_PAGE_SIZE = 200          # 単語・例文リストに一度に読み込む行数
+LIST_MEANING_CHARS = 30       # リストに表示する意味の文字数
+LIST_SENTENCE_CHARS = 120     # リストに表示する例文の文字数
+# リストの並べ替えに使える列（名前 → ORDER BY の式。英語は大文字・小文字を区別しない。どれもインデックスあり）
+LIST_SORT_KEYS = {
+    "words": {"id": "id", "english": "english_word COLLATE NOCASE", "japanese": "japanese_meaning"},
+    "sentences": {"id": "id", "english": "english_sentence COLLATE NOCASE"},
+}
+SEARCH_LIMIT = 200            # 検索で表示する件数（関連度の高い順）
+SEARCH_DEBOUNCE_MS = 250      # 検索欄の入力が止まってから検索するまでの待ち時間
+IMPORT_BATCH_SIZE = 500  # インポート時に1回で照会・書き込む行数（IN (...) の変数が古い SQLite の上限 999 を超えないように）
+IMPORT_HEADER_NAMES = {"english", "word", "sentence", "english_word", "english_sentence", "front", "英語", "英単語", "英文"}
+IMPORT_JAPANESE_HEADER_NAMES = {"japanese", "meaning", "translation", "japanese_meaning", "japanese_translation", "back", "日本語", "意味", "和訳"}
+
+# エクスポートするテーブルと列
+EXPORT_TABLES = {
+    "words": ["id", "english_word", "japanese_meaning", "created_at"],
+    "sentences": ["id", "english_sentence", "japanese_translation", "created_at"],
+    "wrong_questions": ["question_type", "question_content", "correct_answer", "consecutive_correct", "created_at"],
+}
+EXPORT_FORMATS = ("csv", "jsonl")
+
+# インポート結果（conflicts は (英語, 登録済みの訳, 新しい訳) の例を最大数件）
+ImportResult = namedtuple("ImportResult", ["added", "updated", "unchanged", "skipped", "conflicts"])
+
+# 4択クイズの1問（choices はシャッフル済みで正解を含む）。先頭3つは従来の (英単語, 意味, 連続正解数) と同じ並び
+QuizQuestion = namedtuple("QuizQuestion", ["english", "answer", "consecutive_correct", "choices"])
+# 出題前にまとめて作っておく4択クイズ1回分（作成後は変更しない）
+QuizSession = namedtuple("QuizSession", ["question_type", "questions"])
+
+# 再生する音声（ファイルパスとメモリ上のデータのどちらか、または両方）
+AudioClip = namedtuple("AudioClip", ["path", "data"])
+
+# --- 音声再生バックエンド ---
+class AudioBackend:
+    """音声再生バックエンドの基底クラス
+
+    channel ごとに再生中の音声は1つだけで、同じ channel で新たに再生すると前の音声は止まる。
+    """
+    name = "base"
+    prefers_memory = False  # True ならメモリ上のデータで再生したほうが効率が良い
+
+    def __init__(self):
+        self._preloaded = {}  # name -> AudioClip
+
+    def play(self, clip, channel="effect", wait=False):
+        raise NotImplementedError
+
+    def preload(self, name, path):
+        """効果音などを一度だけ読み込んで常駐させる"""
+        with open(path, "rb") as f:
+            self._preloaded[name] = AudioClip(os.path.abspath(path), f.read())
+
+    def play_preloaded(self, name, channel="effect"):
+        """preload 済みの音声を再生（読み込まれていなければ何もしない）"""
+        clip = self._preloaded.get(name)
+        if clip is not None:
+            self.play(clip, channel)
+
+    def unload(self, name):
+        """preload した音声を1つ解放"""
+        self._preloaded.pop(name, None)
+
+    def unload_all(self):
+        """preload した音声を解放"""
+        self._preloaded.clear()
+
+    def stop(self, channel=None):
+        """channel の再生を止める（None なら全て）"""
+
+    def close(self):
+        self.stop()
+
+
+class WindowsMCIBackend(AudioBackend):
+    """Windows の MCI (winmm) で再生"""
+    name = "mci"
+
+    def __init__(self):
+        super().__init__()
+        self._winmm = ctypes.windll.winmm
+        self._lock = threading.Lock()
+        self._aliases = {}  # channel -> alias
+        self._temp_files = {}  # alias -> 再生用に書き出した一時ファイル（close したあとに削除）
+        self._counter = itertools.count()
+        self._resident = {}  # name -> 開いたままにしておく alias
+        self._resident_playing = {}  # channel -> 再生中の常駐 alias
+
+    def _send(self, command):
+        buf = ctypes.create_unicode_buffer(128)
+        self._winmm.mciSendStringW(command, buf, len(buf), None)
+        return buf.value
+
+    def play(self, clip, channel="effect", wait=False):
+        path = clip.path
+        if path is None:
+            # MCI はメモリから再生できないため、データのみの場合は一時ファイルに書き出す
+            fd, path = tempfile.mkstemp(suffix=".mp3")
+            with os.fdopen(fd, "wb") as f:
+                f.write(clip.data)
+
+        with self._lock:
+            self._close_locked(channel)
+            alias = f"{channel}_{next(self._counter)}"
+            self._send(f'open "{os.path.abspath(path)}" type mpegvideo alias {alias}')
+            self._send(f'play {alias}')
+            self._aliases[channel] = alias
+            if clip.path is None:
+                self._temp_files[alias] = path
+
+        if wait:
+            # 再生が終わるか、同じ channel の別の再生・停止で置き換わるまで待つ
+            while True:
+                with self._lock:
+                    if self._aliases.get(channel) != alias or self._send(f'status {alias} mode') != "playing":
+                        break
+                threading.Event().wait(0.05)
+
+    def _close_locked(self, channel):
+        alias = self._aliases.pop(channel, None)
+        if alias:
+            self._send(f'stop {alias}')
+            self._send(f'close {alias}')
+            temp_path = self._temp_files.pop(alias, None)
+            if temp_path:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+        resident = self._resident_playing.pop(channel, None)
+        if resident:
+            self._send(f'stop {resident}')
+
+    def preload(self, name, path):
+        """デバイスを開いたままにしておき、再生のたびに open/close しない"""
+        alias = f"fx_{name}"
+        with self._lock:
+            if name in self._resident:
+                self._send(f'close {self._resident.pop(name)}')
+            self._send(f'open "{os.path.abspath(path)}" type mpegvideo alias {alias}')
+            self._resident[name] = alias
+
+    def play_preloaded(self, name, channel="effect"):
+        with self._lock:
+            alias = self._resident.get(name)
+            if alias is None:
+                return
+            self._close_locked(channel)
+            self._send(f'play {alias} from 0')
+            self._resident_playing[channel] = alias
+
+    def stop(self, channel=None):
+        with self._lock:
+            for ch in ([channel] if channel else set(self._aliases) | set(self._resident_playing)):
+                self._close_locked(ch)
+
+    def unload(self, name):
+        """常駐させた音声を閉じる（ほかの channel の再生には触れない）"""
+        with self._lock:
+            alias = self._resident.pop(name, None)
+            if alias is None:
+                return
+            for channel, playing in list(self._resident_playing.items()):
+                if playing == alias:
+                    del self._resident_playing[channel]
+            self._send(f'close {alias}')
+
+    def unload_all(self):
+        self.stop()
+        with self._lock:
+            for alias in self._resident.values():
+                self._send(f'close {alias}')
+            self._resident.clear()
+
+    def close(self):
+        self.unload_all()
+
+
+class SubprocessAudioBackend(AudioBackend):
+    """外部プレーヤー（mpg123 / ffplay / mpv）に標準入力で MP3 を渡して再生（Linux・macOS 向け）"""
+    name = "subprocess"
+    prefers_memory = True
+    PLAYERS = (
+        ("mpg123", ["mpg123", "-q"]),
+        ("ffplay", ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet"]),
+        ("mpv", ["mpv", "--no-video", "--really-quiet"]),
+    )
+
+    def __init__(self, command):
+        super().__init__()
+        self.command = list(command)
+        self._lock = threading.Lock()
+        self._procs = {}  # channel -> Popen
+
+    @classmethod
+    def detect(cls):
+        """インストール済みのプレーヤーを探す（見つからなければNone）"""
+        for executable, command in cls.PLAYERS:
+            if shutil.which(executable):
+                return cls(command)
+        return None
+
+    def play(self, clip, channel="effect", wait=False):
+        source = "-" if clip.data is not None else clip.path
+        with self._lock:
+            self._stop_locked(channel)
+            proc = subprocess.Popen(self.command + [source],
+                                    stdin=subprocess.PIPE if source == "-" else subprocess.DEVNULL,
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            self._procs[channel] = proc
+
+        if source == "-":
+            if wait:
+                self._feed(proc, clip.data)
+            else:
+                threading.Thread(target=self._feed, args=(proc, clip.data), daemon=True).start()
+        if wait:
+            proc.wait()
+
+    @staticmethod
+    def _feed(proc, data):
+        try:
+            proc.stdin.write(data)
+            proc.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass  # 再生が途中で止められた
+
+    def _stop_locked(self, channel):
+        proc = self._procs.pop(channel, None)
+        if proc and proc.poll() is None:
+            proc.terminate()
+
+    def stop(self, channel=None):
+        with self._lock:
+            for ch in ([channel] if channel else list(self._procs)):
+                self._stop_locked(ch)
+
+
+class NullAudioBackend(AudioBackend):
+    """何も再生せず、再生要求を記録するだけ（テスト・ベンチマーク・音声なし環境用）"""
+    name = "null"
+    prefers_memory = True
+
+    def __init__(self):
+        super().__init__()
+        self.played = deque(maxlen=100)  # 直近の (channel, clip)
+        self.stop_count = 0
+
+    def play(self, clip, channel="effect", wait=False):
+        self.played.append((channel, clip))
+
+    def stop(self, channel=None):
+        self.stop_count += 1
+
+
+def create_audio_backend(kind=AUDIO_BACKEND_DEFAULT):
+    """設定と実行環境に合った再生バックエンドを作成"""
+    if kind == "null":
+        return NullAudioBackend()
+    if kind == "mci" or (kind == "auto" and sys.platform == "win32"):
+        return WindowsMCIBackend()
+    backend = SubprocessAudioBackend.detect()
+    if backend is None:
+        print("Audio: 再生用プレーヤー (mpg123 / ffplay / mpv) が見つからないため、音声は再生されません。")
+        return NullAudioBackend()
+    return backend
+
+# --- 音声キャッシュクラス ---
+class TTSAudioCache:
+    """TTS音声のディスクキャッシュ（テキスト・音声・速度のハッシュをキーに、容量上限をLRUで管理）"""
+    def __init__(self, cache_dir=TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_BYTES, memory_max_bytes=TTS_MEMORY_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.memory_max_bytes = memory_max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> ファイルサイズ（古い順）
+        self._total_bytes = 0
+        self._pinned = set()  # 一括作成中の音声のキー（上限を超えても削除しない）
+        self._memory = OrderedDict()  # key -> 音声データ（最近使った分だけ保持）
+        self._memory_bytes = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_entries()
+
+    @staticmethod
+    def make_key(text, voice=TTS_VOICE, rate=TTS_RATE):
+        """キャッシュキーを生成"""
+        payload = "\x1f".join((voice, rate, text.strip()))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path_for_key(self, key):
+        return os.path.join(self.cache_dir, f"{key}.mp3")
+
+    def _load_entries(self):
+        """既存のキャッシュファイルを最終アクセス順に読み込む"""
+        files = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith(".part"):
+                # 中断された書き込みの残骸は削除
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            if not name.endswith(".mp3"):
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            files.append((st.st_mtime, name[:-4], st.st_size))
+
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._total_bytes += size
+        with self._lock:
+            self._evict_locked()
+
+    def lookup(self, text, voice=TTS_VOICE, rate=TTS_RATE):
+        """キャッシュ済みなら音声ファイルのパスを返す（なければNone）"""
+        key = self.make_key(text, voice, rate)
+        path = self.path_for_key(key)
+        with self._lock:
+            if key not in self._entries:
+                return None
+            if not os.path.exists(path):
+                self._total_bytes -= self._entries.pop(key)
+                return None
+            self._entries.move_to_end(key)
+        try:
+            os.utime(path, None)  # 再起動後もLRU順を保つ
+        except OSError:
+            pass
+        return path
+
+    def contains(self, text, voice=TTS_VOICE, rate=TTS_RATE):
+        with self._lock:
+            return self.make_key(text, voice, rate) in self._entries
+
+    def load_bytes(self, text, voice=TTS_VOICE, rate=TTS_RATE):
+        """キャッシュ済みの音声データを返す（メモリになければディスクから読み込む）"""
+        key = self.make_key(text, voice, rate)
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                return data
+        path = self.lookup(text, voice, rate)
+        if not path:
+            return None
+        with open(path, "rb") as f:
+            data = f.read()
+        self._remember(key, data)
+        return data
+
+    def _remember(self, key, data):
+        """音声データをメモリに保持（上限を超えたら古い順に捨てる）"""
+        if len(data) > self.memory_max_bytes:
+            return
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= len(old)
+            self._memory[key] = data
+            self._memory_bytes += len(data)
+            while self._memory_bytes > self.memory_max_bytes:
+                _, dropped = self._memory.popitem(last=False)
+                self._memory_bytes -= len(dropped)
+
+    def _commit(self, key, data):
+        """音声データを一時ファイル経由でキャッシュに書き込む"""
+        path = self.path_for_key(key)
+        fd, tmp_path = tempfile.mkstemp(suffix=".part", dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)
+            self._entries[key] = len(data)
+            self._total_bytes += len(data)
+            self._evict_locked()
+        return path
+
+    def _evict_locked(self):
+        """上限を超えた分を古い順に削除（直近の1件と一括作成中の音声は残す）"""
+        if self._total_bytes <= self.max_bytes:
+            return
+        for key in list(self._entries):
+            if self._total_bytes <= self.max_bytes or len(self._entries) <= 1:
+                break
+            if key in self._pinned:
+                continue
+            self._total_bytes -= self._entries.pop(key)
+            try:
+                os.remove(self.path_for_key(key))
+            except OSError:
+                pass
+
+    async def get_or_synthesize(self, text, voice=TTS_VOICE, rate=TTS_RATE, keep_in_memory=True):
+        """キャッシュから取得、なければ合成して保存し、音声ファイルのパスを返す"""
+        path = self.lookup(text, voice, rate)
+        if path:
+            return path
+
+        key = self.make_key(text, voice, rate)
+        communicate = edge_tts.Communicate(text, voice, rate=rate)
+        chunks = []
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                chunks.append(chunk["data"])
+        data = b"".join(chunks)
+        if keep_in_memory:
+            self._remember(key, data)
+        return self._commit(key, data)
+
+    async def prerender(self, texts, concurrency=TTS_PRERENDER_CONCURRENCY, progress=None):
+        """複数テキストの音声を同時数を制限して一括作成（キャッシュ済みはスキップ）
+
+        progress(done, total, failed) が指定されていれば1件ごとに呼び出す。
+        書き込みは一時ファイル経由なので、中断しても再実行すれば続きから作成される。
+        作成中は対象の音声を容量上限による削除から外す（先に作った分を消して終わらなくなるのを防ぐ）。
+        戻り値の deck_bytes（対象の音声の合計サイズ）が max_bytes を超えていれば、次に上限を超えたときに古い分が消える。
+        """
+        seen = set()
+        todo = []
+        for text in texts:
+            text = (text or "").strip()
+            if not text or text in seen:
+                continue
+            seen.add(text)
+            if not self.contains(text):
+                todo.append(text)
+
+        total = len(todo)
+        state = {"done": 0, "failed": 0, "deck_bytes": 0}
+        keys = {self.make_key(text) for text in seen}
+        if progress:
+            progress(0, total, 0)
+
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def _render(text):
+            async with semaphore:
+                try:
+                    await self.get_or_synthesize(text, keep_in_memory=False)
+                except Exception as e:
+                    state["failed"] += 1
+                    print(f"TTS Prerender Error ({text[:30]}): {e}")
+                state["done"] += 1
+                if progress:
+                    progress(state["done"], total, state["failed"])
+
+        with self._lock:
+            self._pinned |= keys
+        try:
+            await asyncio.gather(*(_render(text) for text in todo))
+        finally:
+            with self._lock:
+                self._pinned -= keys
+                state["deck_bytes"] = sum(self._entries.get(key, 0) for key in keys)
+        return state
+
+    def clear(self):
+        """キャッシュを全削除"""
+        with self._lock:
+            for key in list(self._entries):
+                try:
+                    os.remove(self.path_for_key(key))
+                except OSError:
+                    pass
+            self._entries.clear()
+            self._total_bytes = 0
+            self._memory.clear()
+            self._memory_bytes = 0
+
+# --- 非同期処理スレッドクラス ---
+class AsyncLoopWorker:
+    """専用スレッドで1つのイベントループを動かし続け、他スレッドからコルーチンを受け付ける"""
+    def __init__(self, name="async-worker"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """コルーチンをループに投入し、concurrent.futures.Future を返す（スレッドセーフ）"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def stop(self):
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+# --- TTSサービスクラス ---
+class TTSService:
+    """TTSの合成・再生を App 所有の1本のイベントループで処理する
+
+    同じテキストの合成が同時に要求された場合は1つのジョブを共有し、
+    読み上げは常に最新の1件だけを有効にする（新しい要求が来たら古いものは取り消す）。
+    """
+    def __init__(self, cache, backend, max_concurrent=TTS_SYNTH_CONCURRENCY):
+        self.cache = cache
+        self.backend = backend
+        self.max_concurrent = max_concurrent
+        self.worker = AsyncLoopWorker("tts-loop")
+        self._semaphore = None  # ループ上で生成する
+        self._inflight = {}  # キャッシュキー -> [合成タスク, 待機数]（ループ上でのみ操作）
+        self._current_speech = None  # 再生中・再生待ちの読み上げ Future（Tkスレッドでのみ操作）
+
+    def submit(self, coro):
+        return self.worker.submit(coro)
+
+    async def synthesize(self, text):
+        """同時数を制限して合成（キャッシュ済みなら即座にパスを返す）
+
+        同じテキストの合成中なら完了を待って結果を共有する。
+        待っている要求がすべて取り消された場合は合成自体も中止する。
+        """
+        path = self.cache.lookup(text)
+        if path:
+            return path
+
+        key = self.cache.make_key(text)
+        entry = self._inflight.get(key)
+        if entry is None:
+            entry = [asyncio.ensure_future(self._synthesize_limited(text)), 0]
+            self._inflight[key] = entry
+            entry[0].add_done_callback(lambda t, k=key, e=entry: self._inflight.pop(k, None) if self._inflight.get(k) is e else None)
+
+        entry[1] += 1
+        try:
+            return await asyncio.shield(entry[0])
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and not entry[0].done():
+                entry[0].cancel()
+
+    async def _synthesize_limited(self, text):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        async with self._semaphore:
+            return await self.cache.get_or_synthesize(text)
+
+    def prefetch(self, text):
+        """音声をキャッシュに合成しておく（Futureを返す）"""
+        return self.submit(self._prefetch(text))
+
+    async def _prefetch(self, text):
+        try:
+            await self.synthesize(text)
+        except Exception as e:
+            print(f"TTS Prefetch Error: {e}")
+
+    def speak(self, text):
+        """合成して再生する（Futureを返す。再生が終わると完了する）
+
+        前の読み上げがまだ合成中・再生中なら取り消す。
+        """
+        self.cancel_speech()
+        self._current_speech = self.submit(self._speak(text))
+        return self._current_speech
+
+    def cancel_speech(self):
+        """読み上げを取り消す（画面が次の問題へ進んだときなど）"""
+        if self._current_speech is not None:
+            self._current_speech.cancel()
+            self._current_speech = None
+
+    async def _speak(self, text):
+        try:
+            audio_path = await self.synthesize(text)
+            data = self.cache.load_bytes(text) if self.backend.prefers_memory else None
+            clip = AudioClip(audio_path, data)
+            await asyncio.get_running_loop().run_in_executor(None, lambda: self.backend.play(clip, "speech", wait=True))
+        except asyncio.CancelledError:
+            self.backend.stop("speech")
+            raise
+        except Exception as e:
+            print(f"TTS Error: {e}")
+
+    def close(self):
+        self.worker.stop()
+
+# --- 音声先読みクラス ---
+class TTSPrefetcher:
+    """クイズの出題順に沿って、次の数問分の音声をバックグラウンドで合成しておく"""
+    def __init__(self, service, texts, ahead=TTS_PREFETCH_AHEAD):
+        self.service = service
+        self.texts = list(texts)
+        self.ahead = ahead
+        self._lock = threading.Lock()
+        self._pending = {}  # text -> Future
+        self._closed = False
+
+    def advance(self, index):
+        """index番目を出題した時点で、その先の問題の音声を合成予約"""
+        for text in self.texts[index + 1:index + 1 + self.ahead]:
+            self._schedule(text)
+
+    def _schedule(self, text):
+        if not text or self.service.cache.contains(text):
+            return
+        with self._lock:
+            if self._closed or text in self._pending:
+                return
+            future = self.service.prefetch(text)
+            self._pending[text] = future
+        future.add_done_callback(lambda f, t=text: self._on_done(t))
+
+    def _on_done(self, text):
+        with self._lock:
+            self._pending.pop(text, None)
+
+    def close(self):
+        """未完了の先読みを取り消して終了"""
+        with self._lock:
+            self._closed = True
+            pending = list(self._pending.values())
+        for future in pending:
+            future.cancel()
+
+# --- 翻訳テキストの前処理 ---
+def configure_deepl_http():
+    """DeepL の通信にタイムアウトを設定し、再試行を1回までにする"""
+    deepl.http_client.min_connection_timeout = TRANSLATION_NETWORK_TIMEOUT
+    deepl.http_client.max_network_retries = 1
+
+def call_with_timeout(func, *args, timeout=TRANSLATION_NETWORK_TIMEOUT):
+    """タイムアウトを指定できない通信を別スレッドで実行し、timeout 秒まで結果を待つ
+
+    待ちきれなければ FutureTimeoutError。止まった通信はそのスレッドに残し、呼び出し元のワーカーは空ける。
+    """
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(func(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="translate-call", daemon=True).start()
+    return future.result(timeout)
+
+def clean_translation_text(text):
+    """翻訳前にテキストの改行・空白を整える"""
+    cleaned_text = text.strip()
+    cleaned_text = re.sub(r'\r\n', '\n', cleaned_text)
+    cleaned_text = re.sub(r'\n\s*\n', '\n', cleaned_text)
+    cleaned_text = re.sub(r'[ \t]+', ' ', cleaned_text)
+    return cleaned_text
+
+def normalize_translation_key(text):
+    """翻訳キャッシュのキー（全角・半角の揺れと空白の違いを吸収）"""
+    return clean_translation_text(unicodedata.normalize("NFKC", text))
+
+def is_translation_error(text):
+    """translate_deepl / translate_google のエラーメッセージかどうか"""
+    return bool(text) and text.startswith("（") and text.endswith("）")
+
+# 選択肢の比較で無視する記号・空白
+_MEANING_STRIP_TABLE = str.maketrans("", "", "・ 、。")
+
+def normalize_meaning(text):
+    """選択肢の重複判定用に意味を正規化（小文字化して記号・空白を除く）"""
+    return text.lower().translate(_MEANING_STRIP_TABLE)
+
+# 重複判定で英語の前後から取り除く引用符・括弧（+ # ? ! などの記号は残す）
+_ENGLISH_KEY_QUOTES = "\"'“”‘’「」『』()[]{}"
+
+def loose_english_key(text):
+    """大文字・小文字と空白の違いだけを無視したキー（移行でまとめてよい行かどうかの判定用）"""
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+def normalize_english_key(text):
+    """英単語・英文の重複判定用のキー（全角・半角、大文字・小文字、空白の違いと、前後の引用符・括弧、最後の "." を無視）
+
+    + # ? ! - などは意味が変わるので残す（"C++" と "C"、"Hi?" と "Hi!" は別のキー）。
+    """
+    key = loose_english_key(text).strip(_ENGLISH_KEY_QUOTES).strip()
+    if key.endswith(".") and len(key) > 1:
+        key = key[:-1].rstrip().strip(_ENGLISH_KEY_QUOTES).strip()
+    return key or loose_english_key(text)
+
+def merge_meanings(meanings):
+    """複数の意味を "; " でつなぐ（同じ語義は1つにまとめる）"""
+    merged, seen = [], set()
+    for meaning in meanings:
+        for part in meaning.split(';'):
+            part = part.strip()
+            norm = normalize_meaning(part)
+            if part and norm not in seen:
+                seen.add(norm)
+                merged.append(part)
+    return "; ".join(merged)
+
+def merge_english_duplicates(conn, kind):
+    """english_key を埋め、大文字・小文字と空白しか違わない行を最も古い行にまとめる（意味は merge_meanings でつなぐ）
+
+    キーは同じでも引用符や最後の "." などが違う行は消さずに残し、キーに改行と id を付けて別の項目にする
+    （正規化したキーは空白をまとめるので改行を含まず、入力のキーと重なることはない）。
+    """
+    english_col, japanese_col = ("english_word", "japanese_meaning") if kind == "words" else ("english_sentence", "japanese_translation")
+    groups = {}
+    for row_id, english, japanese in conn.execute(f"SELECT id, {english_col}, {japanese_col} FROM {kind} ORDER BY id"):
+        groups.setdefault(normalize_english_key(english), []).append((row_id, loose_english_key(english), japanese))
+    keys, merged, duplicates = [], [], []
+    for key, rows in groups.items():
+        keeper_id, keeper_loose, _ = rows[0]
+        keys.append((key, keeper_id))
+        keys.extend((f"{key}\n{row_id}", row_id) for row_id, loose, _ in rows[1:] if loose != keeper_loose)
+        same = [japanese for _, loose, japanese in rows if loose == keeper_loose]
+        if len(same) > 1:
+            merged.append((merge_meanings(same), keeper_id))
+            duplicates.extend((row_id,) for row_id, loose, _ in rows[1:] if loose == keeper_loose)
+    # 削除は daily_counts・検索・似た単語のトリガーにも反映される
+    conn.executemany(f"DELETE FROM {kind} WHERE id = ?", duplicates)
+    conn.executemany(f"UPDATE {kind} SET {japanese_col} = ? WHERE id = ?", merged)
+    conn.executemany(f"UPDATE {kind} SET english_key = ? WHERE id = ?", keys)
+
+# リストの検索用の全文検索インデックス。英語は単語の前方一致（unicode61）、日本語は部分一致（trigram）。
+# rowid は 単語 = id * 2、例文 = id * 2 + 1 で、トリガーで追加・更新・削除に追従する
+SEARCH_INDEX_STATEMENTS = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_english USING fts5(text, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_japanese USING fts5(text, tokenize = 'trigram')",
+    """CREATE TRIGGER IF NOT EXISTS words_search_ai AFTER INSERT ON words BEGIN
+        INSERT INTO search_english (rowid, text) VALUES (new.id * 2, new.english_word);
+        INSERT INTO search_japanese (rowid, text) VALUES (new.id * 2, new.japanese_meaning);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS words_search_au AFTER UPDATE OF english_word, japanese_meaning ON words BEGIN
+        UPDATE search_english SET text = new.english_word WHERE rowid = old.id * 2;
+        UPDATE search_japanese SET text = new.japanese_meaning WHERE rowid = old.id * 2;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS words_search_ad AFTER DELETE ON words BEGIN
+        DELETE FROM search_english WHERE rowid = old.id * 2;
+        DELETE FROM search_japanese WHERE rowid = old.id * 2;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS sentences_search_ai AFTER INSERT ON sentences BEGIN
+        INSERT INTO search_english (rowid, text) VALUES (new.id * 2 + 1, new.english_sentence);
+        INSERT INTO search_japanese (rowid, text) VALUES (new.id * 2 + 1, new.japanese_translation);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS sentences_search_au AFTER UPDATE OF english_sentence, japanese_translation ON sentences BEGIN
+        UPDATE search_english SET text = new.english_sentence WHERE rowid = old.id * 2 + 1;
+        UPDATE search_japanese SET text = new.japanese_translation WHERE rowid = old.id * 2 + 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS sentences_search_ad AFTER DELETE ON sentences BEGIN
+        DELETE FROM search_english WHERE rowid = old.id * 2 + 1;
+        DELETE FROM search_japanese WHERE rowid = old.id * 2 + 1;
+    END""",
+    "INSERT INTO search_english (rowid, text) SELECT id * 2, english_word FROM words",
+    "INSERT INTO search_japanese (rowid, text) SELECT id * 2, japanese_meaning FROM words",
+    "INSERT INTO search_english (rowid, text) SELECT id * 2 + 1, english_sentence FROM sentences",
+    "INSERT INTO search_japanese (rowid, text) SELECT id * 2 + 1, japanese_translation FROM sentences",
+]
+
+def create_search_index(conn):
+    """検索用の全文検索インデックスを作る（作ってあれば何もしない）。使えるなら True
+
+    FTS5 の trigram は SQLite 3.34 以降なので、使えない環境では作らずに False を返す（検索欄を無効にして起動する）。
+    """
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_english'").fetchone():
+        return True
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.search_probe USING fts5(text, tokenize = 'trigram')")
+        conn.execute("DROP TABLE temp.search_probe")
+    except sqlite3.OperationalError:
+        return False
+    for statement in SEARCH_INDEX_STATEMENTS:
+        conn.execute(statement)
+    return True
+
+# 検索語を日本語訳の側で探すかどうかの判定に使う（ひらがな・カタカナ・半角カナ・漢字）
+_JAPANESE_CHARS = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff66-\uff9f\u3005]")
+
+def escape_like(text):
+    """LIKE のパターンに使えるよう % _ \\ をエスケープする（ESCAPE '\\' と組み合わせる）"""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def word_grams(english, meaning):
+    """似た単語を探すための n-gram（英語は前後に印を付けた3文字、意味は最初の語義の2文字）"""
+    grams = set()
+    padded = f"^{english.strip().lower()}$"
+    grams.update("e:" + padded[i:i + 3] for i in range(len(padded) - 2))
+    norm = normalize_meaning((meaning or "").split(';')[0].strip())
+    grams.update("j:" + norm[i:i + 2] for i in range(len(norm) - 1))
+    return grams
+
+class DistractorPool:
+    """4択クイズの誤答選択肢の候補（クイズ開始時に一度だけ作る）
+
+    各意味の最初の語義を正規化して重複を除いておき、出題時は候補から乱数で引いて
+    正解と重なるもの（同じ・部分一致）だけを捨てるので、1問あたり数回の比較で済む。
+    similar に {英単語: [似た単語の意味, ...]} を入れておくと、そこから優先して選ぶ（難しい選択肢）。
+    """
+
+    def __init__(self, meanings, similar=None):
+        self.choices = []  # [(表示する意味, 正規化した意味), ...]
+        self.similar = similar or {}
+        seen = set()
+        for meaning in meanings:
+            cand = (meaning or "").split(';')[0].strip()
+            norm = normalize_meaning(cand)
+            if len(norm) < 2 or norm in seen:
+                continue
+            seen.add(norm)
+            self.choices.append((cand, norm))
+
+    @classmethod
+    def from_db(cls, db, similar_for=None):
+        """similar_for に問題 [(英単語, 意味), ...] を渡すと似た単語の意味も用意する"""
+        similar = db.get_similar_meanings(similar_for) if similar_for else None
+        return cls(db.iter_word_meanings(), similar)
+
+    @staticmethod
+    def _conflicts(norm, base):
+        return norm == base or base in norm or norm in base
+
+    def _pick_similar(self, english, base, n, seen):
+        """似た単語の意味から n 件まで選ぶ（毎回同じにならないよう上位の中で入れ替える）"""
+        picked = []
+        ranked = self.similar.get(english, [])
+        top = ranked[:n * 2]
+        random.shuffle(top)
+        for meaning in top + ranked[n * 2:]:
+            cand = meaning.split(';')[0].strip()
+            norm = normalize_meaning(cand)
+            if len(norm) < 2 or norm in seen or self._conflicts(norm, base):
+                continue
+            picked.append(cand)
+            seen.add(norm)
+            if len(picked) >= n:
+                break
+        return picked
+
+    def pick(self, correct_meaning, n=3, english=None):
+        """正解と紛らわしくない誤答を n 件返す（足りなければ埋め草で補う）"""
+        base = normalize_meaning(correct_meaning.split(';')[0].strip())
+        seen = set()
+        picked = self._pick_similar(english, base, n, seen) if english in self.similar else []
+        used = set()
+        if self.choices:
+            # まず乱数で引き、外れが続いたら順に探す
+            for _ in range(n * 8):
+                if len(picked) >= n:
+                    break
+                i = random.randrange(len(self.choices))
+                cand, norm = self.choices[i]
+                if i not in used and norm not in seen and not self._conflicts(norm, base):
+                    picked.append(cand)
+                    seen.add(norm)
+                used.add(i)
+            if len(picked) < n:
+                start = random.randrange(len(self.choices))
+                for j in range(len(self.choices)):
+                    i = (start + j) % len(self.choices)
+                    cand, norm = self.choices[i]
+                    if i not in used and norm not in seen and not self._conflicts(norm, base):
+                        picked.append(cand)
+                        seen.add(norm)
+                        used.add(i)
+                        if len(picked) >= n:
+                            break
+
+        for dummy in DUMMY_CHOICES:
+            if len(picked) >= n:
+                break
+            if dummy not in picked and dummy != correct_meaning:
+                picked.append(dummy)
+        return picked[:n]
+
+    def make_choices(self, correct_meaning, n=4, english=None):
+        """正解を含む n 択の選択肢をシャッフルして返す"""
+        choices = [correct_meaning] + self.pick(correct_meaning, n - 1, english)
+        random.shuffle(choices)
+        return choices
+
+def build_choice_session(db, rows, question_type="word_choice", hard=False):
+    """4択クイズ1回分の問題・選択肢・正解をまとめて作る（Tk がなくても使える）
+
+    rows は [(英単語, 意味), ...] または [(英単語, 意味, 連続正解数), ...]。
+    誤答候補の読み込み（と hard のときの似た単語の検索）はここで一度だけ行う。
+    """
+    pool = DistractorPool.from_db(db, similar_for=rows if hard else None)
+    questions = tuple(
+        QuizQuestion(row[0], row[1], row[2] if len(row) > 2 else 0,
+                     tuple(pool.make_choices(row[1], english=row[0])))
+        for row in rows
+    )
+    return QuizSession(question_type, questions)
+
+def read_text_list(path):
+    """1行に1件の単語・例文リストを読み込む（空行は無視）"""
+    with open(path, "r", encoding="utf-8-sig") as f:
+        return [line.strip() for line in f if line.strip()]
+
+def _strip_anki_html(text):
+    """Anki の書き出しに含まれる HTML タグ・文字参照を取り除く"""
+    text = re.sub(r"<br\s*/?>", " ", text, flags=re.IGNORECASE)
+    return html.unescape(re.sub(r"<[^>]+>", "", text)).strip()
+
+def iter_import_rows(path):
+    """CSV / TSV / Anki（テキスト書き出し）から (英語, 日本語) を1行ずつ返す
+
+    ファイル全体は読み込まず、行ごとに処理する（.gz は展開しながら読む）。
+    見出し行（空行を除いた最初の行）があれば列名で英語・日本語の列を探し、なければ1列目・2列目を使う。
+    Anki の "#guid column:1" などで示された GUID・ノートタイプ・デッキ・タグの列は飛ばす。
+    列が足りない行は (英語, None) を返す。
+    """
+    compressed = path.lower().endswith(".gz")
+    name = path[:-3] if compressed else path
+    opener = gzip.open if compressed else open
+    with opener(path, "rt", encoding="utf-8-sig", newline="") as f:
+        first = f.readline()
+        is_anki = first.startswith("#")
+        delimiter = "\t" if ("\t" in first or name.lower().endswith((".tsv", ".txt"))) else ","
+
+        lines = itertools.chain([first], f)
+        english_col, japanese_col = 0, 1
+        if is_anki:
+            # "#separator:tab" などのヘッダ行を読み飛ばす
+            headers = {}
+            for line in lines:
+                if not line.startswith("#"):
+                    lines = itertools.chain([line], lines)
+                    break
+                key, _, value = line[1:].strip().partition(":")
+                headers[key.lower()] = value.strip().lower()
+            delimiter = {"comma": ",", "semicolon": ";", "pipe": "|", "space": " "}.get(headers.get("separator"), "\t")
+            # "#guid column:1" などはフィールドではない列（1始まり）
+            meta_cols = {int(headers[f"{name} column"]) - 1 for name in ("guid", "notetype", "deck", "tags")
+                         if headers.get(f"{name} column", "").isdigit()}
+            field_cols = (j for j in itertools.count() if j not in meta_cols)
+            english_col, japanese_col = next(field_cols), next(field_cols)
+
+        header_checked = False
+        for row in csv.reader(lines, delimiter=delimiter):
+            if not row or not any(field.strip() for field in row):
+                continue
+            if is_anki:
+                row = [_strip_anki_html(field) for field in row]
+            if not header_checked:
+                header_checked = True
+                names = [field.strip().lower() for field in row]
+                if IMPORT_HEADER_NAMES.intersection(names):
+                    # 見出し行（エクスポートしたファイルなど）
+                    english_col = next(j for j, n in enumerate(names) if n in IMPORT_HEADER_NAMES)
+                    japanese_col = next((j for j, n in enumerate(names) if n in IMPORT_JAPANESE_HEADER_NAMES), english_col + 1)
+                    continue
+            english = row[english_col].strip() if len(row) > english_col else ""
+            japanese = row[japanese_col].strip() if len(row) > japanese_col else ""
+            yield english, (japanese or None)
+
+class BulkTranslator:
+    """単語・例文リストの一括翻訳
+
+    DeepL にはまとめて（translate_text にリストで）送り、失敗したものは1件ずつ Google 翻訳で補う。
+    結果はバッチごとに翻訳キャッシュへ保存するので、途中で止まっても続きから再開できる。
+    """
+
+    def __init__(self, db, deepl_translate=None, google_translate=None,
+                 max_texts=DEEPL_BATCH_MAX_TEXTS, max_bytes=DEEPL_BATCH_MAX_BYTES):
+        self.db = db
+        self.deepl_translate = deepl_translate    # list[str] -> list[str]
+        self.google_translate = google_translate  # str -> str
+        self.max_texts = max_texts
+        self.max_bytes = max_bytes
+        self.stats = {"cached": 0, "deepl": 0, "google": 0, "failed": 0}
+
+    def _batches(self, texts):
+        """DeepL の件数・サイズ上限に収まるように分割"""
+        batch, size = [], 0
+        for text in texts:
+            text_size = len(text.encode("utf-8"))
+            if batch and (len(batch) >= self.max_texts or size + text_size > self.max_bytes):
+                yield batch
+                batch, size = [], 0
+            batch.append(text)
+            size += text_size
+        if batch:
+            yield batch
+
+    def _translate_with_google(self, texts):
+        results = {}
+        if self.google_translate is None:
+            return results
+        for text in texts:
+            try:
+                translated = self.google_translate(clean_translation_text(text))
+            except Exception as e:
+                print(f"Google translate error ({text}): {e}")
+                continue
+            if translated and not is_translation_error(translated):
+                results[text] = translated
+        return results
+
+    def translate(self, texts, progress=None, cancel_event=None):
+        """texts を翻訳して {原文: 訳文} を返す（翻訳できなかったものは含まない）
+
+        表記揺れだけ違う入力は1回だけ翻訳し、同じ訳をそれぞれの原文に割り当てる。
+        """
+        # 表記揺れを吸収して重複を除く
+        keys = {text: normalize_translation_key(text) for text in texts}
+        unique = {}
+        for text, key in keys.items():
+            unique.setdefault(key, text)
+
+        cached = self.db.get_cached_translations("JA", list(unique))
+        results = {unique[key]: translated for key, translated in cached.items()}
+        pending = [text for key, text in unique.items() if key not in cached]
+        self.stats["cached"] = len(results)
+
+        total = len(unique)
+        if progress:
+            progress(len(results), total)
+
+        for batch in self._batches(pending):
+            if cancel_event is not None and cancel_event.is_set():
+                break
+
+            translated = {}
+            if self.deepl_translate is not None:
+                try:
+                    outputs = self.deepl_translate([clean_translation_text(text) for text in batch])
+                    translated = {text: out for text, out in zip(batch, outputs) if out}
+                    self.db.save_translations("deepl", "JA", translated.items())
+                    self.stats["deepl"] += len(translated)
+                except Exception as e:
+                    print(f"DeepL batch translate error: {e}")
+                    if HAS_TRANSLATOR and isinstance(e, (deepl.QuotaExceededException, deepl.AuthorizationException)):
+                        self.deepl_translate = None  # 上限・認証エラーは以降も続くので Google に切り替える
+
+            rest = [text for text in batch if text not in translated]
+            if rest:
+                fallback = self._translate_with_google(rest)
+                self.db.save_translations("google", "JA", fallback.items())
+                self.stats["google"] += len(fallback)
+                self.stats["failed"] += len(rest) - len(fallback)
+                translated.update(fallback)
+
+            results.update(translated)
+            if progress:
+                progress(len(results) + self.stats["failed"], total)
+
+        # 重複として除いた入力にも、代表の原文の訳を割り当てる
+        for text, key in keys.items():
+            representative = unique[key]
+            if text != representative and representative in results:
+                results[text] = results[representative]
+        return results
+
+# --- 一覧表示（ページ単位の読み込み） ---
+class PagedTreeLoader:
+    """Treeview に行をページ単位で読み込む（スクロールが末尾に近づいたら次のページを追加）
+
+    fetch_page(after, limit, sort, descending) は並び順で after（(並べ替えの値, id)）より後ろの行を返す関数。
+    各行は (id, 表示する値..., 並べ替えの値)。行の iid には id を使う。
+    sort_columns（{見出し: 並べ替えの名前}）を渡すと、見出しのクリックで並べ替える。
+    search(text, limit) を渡すと search_later で検索結果の表示に切り替えられる（空文字で一覧に戻る）。
+    """
+
+    def __init__(self, tree, scrollbar, fetch_page, sort_columns=None, search=None, page_size=LIST_PAGE_SIZE):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.fetch_page = fetch_page
+        self.search = search
+        self.search_text = ""
+        self._search_job = None
+        self.page_size = page_size
+        self.sort = "id"          # 初期表示は新しい順
+        self.descending = True
+        self.last_key = None
+        self.exhausted = False
+        self._pending = False
+        self.sort_columns = sort_columns or {}
+        tree.configure(yscrollcommand=self._on_scroll)
+        scrollbar.configure(command=tree.yview)
+        for heading, sort in self.sort_columns.items():
+            tree.heading(heading, command=lambda sort=sort: self.toggle_sort(sort))
+
+    def reset(self):
+        """一覧を空にして先頭のページから読み直す"""
+        self.tree.delete(*self.tree.get_children())
+        self.last_key = None
+        self.exhausted = False
+        if self.search_text:
+            for row in self.search(self.search_text, SEARCH_LIMIT):
+                self.tree.insert("", tk.END, iid=str(row[0]), values=row)
+            self.exhausted = True
+            return
+        self.load_more()
+
+    def search_later(self, text):
+        """入力が SEARCH_DEBOUNCE_MS 止まってから検索する（打つたびに検索しない）"""
+        if self._search_job is not None:
+            self.tree.after_cancel(self._search_job)
+        self._search_job = self.tree.after(SEARCH_DEBOUNCE_MS, self._run_search, text.strip())
+
+    def _run_search(self, text):
+        self._search_job = None
+        if text != self.search_text:
+            self.search_text = text
+            self.reset()
+
+    def load_more(self):
+        """次のページを読み込む"""
+        self._pending = False
+        if self.exhausted:
+            return
+        rows = self.fetch_page(self.last_key, self.page_size, self.sort, self.descending)
+        for row in rows:
+            if not self.tree.exists(str(row[0])):  # 先頭に追加した行などはもう表示している
+                self.tree.insert("", tk.END, iid=str(row[0]), values=row[:-1])
+        if rows:
+            self.last_key = (rows[-1][-1], rows[-1][0])
+        self.exhausted = len(rows) < self.page_size
+
+    def toggle_sort(self, sort):
+        """見出しがクリックされたら、その列で並べ替える（同じ列なら昇順・降順を切り替え）"""
+        if sort == self.sort:
+            self.descending = not self.descending
+        else:
+            self.sort = sort
+            self.descending = sort == "id"  # ID は新しい順、文字の列は昇順から
+        for heading, column_sort in self.sort_columns.items():
+            mark = (" ▼" if self.descending else " ▲") if column_sort == self.sort else ""
+            self.tree.heading(heading, text=heading + mark)
+        self.reset()
+
+    def upsert_row(self, row, at_top=True):
+        """1行だけ反映する（表示中なら値を更新、なければ新しい順の表示中で at_top のとき先頭に追加）
+
+        文字の列で並べているときに並べ替えの列が変わった行は、位置が合わなくなるので一覧から外す
+        （まだ読み込んでいない位置に移ったなら、スクロールしたときにそこで読み込まれる）。
+        """
+        iid = str(row[0])
+        if self.tree.exists(iid):
+            if self.sort != "id" and not self.search_text and self._sort_value(self.tree.item(iid, "values")) != self._sort_value(row):
+                self.tree.delete(iid)
+            else:
+                self.tree.item(iid, values=row)
+        elif at_top and self.sort == "id" and self.descending and not self.search_text:
+            self.tree.insert("", 0, iid=iid, values=row)
+
+    def _sort_value(self, values):
+        """表示している値のうち、いまの並べ替えの列の値"""
+        heading = next(heading for heading, sort in self.sort_columns.items() if sort == self.sort)
+        return str(values[list(self.tree["columns"]).index(heading)])
+
+    def remove_row(self, row_id):
+        """1行だけ取り除く"""
+        iid = str(row_id)
+        if self.tree.exists(iid):
+            self.tree.delete(iid)
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if float(last) >= 0.9 and not self.exhausted and not self._pending:
+            self._pending = True
+            self.tree.after_idle(self.load_more)
 
 # --- データベース管理クラス ---
 class DatabaseManager:
+    # スキーマの変更履歴（PRAGMA user_version に適用済みの数を記録し、起動時に未適用分だけ実行）
+    MIGRATIONS = [
+        # 1: 日付フィルタ（件数・MIN/MAX・出題）と間違えた問題の絞り込み用インデックス
+        [
+            "CREATE INDEX IF NOT EXISTS idx_words_created_at ON words(created_at)",
+            "CREATE INDEX IF NOT EXISTS idx_sentences_created_at ON sentences(created_at)",
+            "CREATE INDEX IF NOT EXISTS idx_wrong_questions_type_score ON wrong_questions(question_type, consecutive_correct)",
+        ],
+        # 2: 難しい選択肢用の n-gram 索引。単語の追加・変更・削除はトリガーで word_grams_pending に積み、
+        #    refresh_word_grams() でその単語の分だけ作り直す
+        [
+            """CREATE TABLE IF NOT EXISTS word_grams (
+                gram TEXT NOT NULL,
+                word_id INTEGER NOT NULL,
+                PRIMARY KEY (gram, word_id)
+            ) WITHOUT ROWID""",
+            "CREATE INDEX IF NOT EXISTS idx_word_grams_word_id ON word_grams(word_id)",
+            "CREATE TABLE IF NOT EXISTS word_grams_pending (word_id INTEGER PRIMARY KEY)",
+            """CREATE TRIGGER IF NOT EXISTS words_grams_ai AFTER INSERT ON words BEGIN
+                INSERT OR IGNORE INTO word_grams_pending (word_id) VALUES (new.id);
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS words_grams_au AFTER UPDATE OF english_word, japanese_meaning ON words BEGIN
+                INSERT OR IGNORE INTO word_grams_pending (word_id) VALUES (new.id);
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS words_grams_ad AFTER DELETE ON words BEGIN
+                INSERT OR IGNORE INTO word_grams_pending (word_id) VALUES (old.id);
+            END""",
+            "INSERT OR IGNORE INTO word_grams_pending (word_id) SELECT id FROM words",
+        ],
+        # 3: 登録日ごとの単語数・例文数（日付範囲の件数や最古・最新日を日数分の行だけで求める）。
+        #    day はローカル時刻の 'YYYY-MM-DD' で、トリガーで追加・削除・登録日時の変更に追従する
+        [
+            """CREATE TABLE IF NOT EXISTS daily_counts (
+                kind TEXT NOT NULL,   -- 'words' / 'sentences'
+                day TEXT NOT NULL,    -- 'YYYY-MM-DD'（ローカル時刻）
+                count INTEGER NOT NULL,
+                PRIMARY KEY (kind, day)
+            ) WITHOUT ROWID""",
+            """CREATE TRIGGER IF NOT EXISTS words_daily_ai AFTER INSERT ON words WHEN new.created_at IS NOT NULL BEGIN
+                INSERT INTO daily_counts (kind, day, count) VALUES ('words', date(new.created_at, 'unixepoch', 'localtime'), 1)
+                ON CONFLICT (kind, day) DO UPDATE SET count = count + 1;
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS words_daily_ad AFTER DELETE ON words WHEN old.created_at IS NOT NULL BEGIN
+                UPDATE daily_counts SET count = count - 1 WHERE kind = 'words' AND day = date(old.created_at, 'unixepoch', 'localtime');
+                DELETE FROM daily_counts WHERE kind = 'words' AND day = date(old.created_at, 'unixepoch', 'localtime') AND count <= 0;
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS words_daily_au AFTER UPDATE OF created_at ON words BEGIN
+                UPDATE daily_counts SET count = count - 1 WHERE kind = 'words' AND day = date(old.created_at, 'unixepoch', 'localtime');
+                DELETE FROM daily_counts WHERE kind = 'words' AND day = date(old.created_at, 'unixepoch', 'localtime') AND count <= 0;
+                INSERT INTO daily_counts (kind, day, count) SELECT 'words', date(new.created_at, 'unixepoch', 'localtime'), 1 WHERE new.created_at IS NOT NULL
+                ON CONFLICT (kind, day) DO UPDATE SET count = count + 1;
+            END""",
+            """INSERT INTO daily_counts (kind, day, count)
+                SELECT 'words', date(created_at, 'unixepoch', 'localtime'), COUNT(*) FROM words
+                WHERE created_at IS NOT NULL GROUP BY 2""",
+            """CREATE TRIGGER IF NOT EXISTS sentences_daily_ai AFTER INSERT ON sentences WHEN new.created_at IS NOT NULL BEGIN
+                INSERT INTO daily_counts (kind, day, count) VALUES ('sentences', date(new.created_at, 'unixepoch', 'localtime'), 1)
+                ON CONFLICT (kind, day) DO UPDATE SET count = count + 1;
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS sentences_daily_ad AFTER DELETE ON sentences WHEN old.created_at IS NOT NULL BEGIN
+                UPDATE daily_counts SET count = count - 1 WHERE kind = 'sentences' AND day = date(old.created_at, 'unixepoch', 'localtime');
+                DELETE FROM daily_counts WHERE kind = 'sentences' AND day = date(old.created_at, 'unixepoch', 'localtime') AND count <= 0;
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS sentences_daily_au AFTER UPDATE OF created_at ON sentences BEGIN
+                UPDATE daily_counts SET count = count - 1 WHERE kind = 'sentences' AND day = date(old.created_at, 'unixepoch', 'localtime');
+                DELETE FROM daily_counts WHERE kind = 'sentences' AND day = date(old.created_at, 'unixepoch', 'localtime') AND count <= 0;
+                INSERT INTO daily_counts (kind, day, count) SELECT 'sentences', date(new.created_at, 'unixepoch', 'localtime'), 1 WHERE new.created_at IS NOT NULL
+                ON CONFLICT (kind, day) DO UPDATE SET count = count + 1;
+            END""",
+            """INSERT INTO daily_counts (kind, day, count)
+                SELECT 'sentences', date(created_at, 'unixepoch', 'localtime'), COUNT(*) FROM sentences
+                WHERE created_at IS NOT NULL GROUP BY 2""",
+        ],
+        # 4: リストの並べ替え（英語は大文字・小文字を区別しない順）
+        [
+            "CREATE INDEX IF NOT EXISTS idx_words_english_nocase ON words(english_word COLLATE NOCASE)",
+            "CREATE INDEX IF NOT EXISTS idx_words_japanese ON words(japanese_meaning)",
+            "CREATE INDEX IF NOT EXISTS idx_sentences_english_nocase ON sentences(english_sentence COLLATE NOCASE)",
+        ],
+        # 5: リストの検索用の全文検索インデックス（SEARCH_INDEX_STATEMENTS。trigram が使えない SQLite では作らない）
+        [
+            create_search_index,
+        ],
+        # 6: 英語の重複判定用の正規化キー（normalize_english_key）。書き込むときにアプリが埋める。
+        #    大文字・小文字や空白だけ違う登録済みの行は最も古い行にまとめてから一意インデックスを張る
+        #    （それ以外の違いでキーが重なる行は残し、id を付けた別のキーにする）
+        [
+            "ALTER TABLE words ADD COLUMN english_key TEXT",
+            "ALTER TABLE sentences ADD COLUMN english_key TEXT",
+            lambda conn: merge_english_duplicates(conn, "words"),
+            lambda conn: merge_english_duplicates(conn, "sentences"),
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_words_english_key ON words(english_key)",
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_sentences_english_key ON sentences(english_key)",
+        ],
+    ]
+
+    # インデックスが使われているべき問い合わせ（ラベル, SQL, パラメータ, 使うべきインデックス）
+    QUERY_PLAN_CHECKS = [
+        ("単語の抽出（日付範囲）", "SELECT id FROM words WHERE 1=1 AND created_at >= ? AND created_at <= ?", (0, 0), "idx_words_created_at"),
+        ("例文の抽出（日付範囲）", "SELECT id FROM sentences WHERE 1=1 AND created_at >= ? AND created_at <= ?", (0, 0), "idx_sentences_created_at"),
+        ("最初の登録日", "SELECT MIN(day) FROM daily_counts WHERE kind = 'words'", (), "PRIMARY KEY"),
+        ("日付範囲の件数", "SELECT COALESCE(SUM(count), 0) FROM daily_counts WHERE kind = ? AND day >= ? AND day <= ?", ("words", "", ""), "PRIMARY KEY"),
+        ("間違えた問題数", "SELECT COUNT(*) FROM wrong_questions WHERE question_type = ?", ("word_choice",), "idx_wrong_questions_type_score"),
+        ("単語の重複判定", "SELECT id FROM words WHERE english_key = ?", ("",), "idx_words_english_key"),
+        ("単語リスト（英語順）", "SELECT id FROM words WHERE english_word COLLATE NOCASE >= ? AND (english_word COLLATE NOCASE > ? OR id > ?) "
+                              "ORDER BY english_word COLLATE NOCASE ASC, id ASC LIMIT 1", ("", "", 0), "idx_words_english_nocase"),
+    ]
+
     def __init__(self, db_path):
         self.conn = sqlite3.connect(db_path)
+        self.translation_cache_stats = {"hits": 0, "misses": 0}
+        self._stats_cache = None  # (変更の目印, 件数)
         self.create_tables()
+        self.migrate()
+        # 全文検索が使えるか（SQLite が新しくなっていれば、ここで後から作る）
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.has_search = create_search_index(self.conn)
     
     def create_tables(self):
         with self.conn:
@@ -89,7 +1398,48 @@ class DatabaseManager:
                     UNIQUE(question_type, question_content)
                 )
             """)
+
+            # 翻訳結果キャッシュテーブル
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS translations (
+                    engine TEXT NOT NULL,           -- 'deepl', 'google'
+                    target_lang TEXT NOT NULL,      -- 'JA' など
+                    source_key TEXT NOT NULL,       -- 正規化した原文
+                    translated_text TEXT NOT NULL,
+                    created_at INTEGER,
+                    PRIMARY KEY (engine, target_lang, source_key)
+                )
+            """)
     
+    def migrate(self):
+        """未適用のスキーマ変更を順に適用する（SQL の代わりに conn を受け取る関数も置ける）
+
+        sqlite3 は ALTER TABLE などの前にトランザクションを始めないので、版ごとに BEGIN から始めて
+        途中で失敗したら丸ごと戻す（次の起動で同じ版を最初からやり直せる）。
+        """
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        for number, statements in enumerate(self.MIGRATIONS[version:], start=version + 1):
+            with self.conn:
+                self.conn.execute("BEGIN")
+                for statement in statements:
+                    if callable(statement):
+                        statement(self.conn)
+                    else:
+                        self.conn.execute(statement)
+                self.conn.execute(f"PRAGMA user_version = {number}")
+
+    def explain_query_plan(self, query, params=()):
+        """EXPLAIN QUERY PLAN の結果（detail 列）を返す"""
+        return [row[3] for row in self.conn.execute("EXPLAIN QUERY PLAN " + query, params)]
+
+    def check_query_plans(self):
+        """QUERY_PLAN_CHECKS がインデックスを使っているか確認し (ラベル, 実行計画, OK) の一覧を返す"""
+        results = []
+        for label, query, params, index_name in self.QUERY_PLAN_CHECKS:
+            plan = " / ".join(self.explain_query_plan(query, params))
+            results.append((label, plan, index_name in plan))
+        return results
+
     def close(self):
         self.conn.close()
     
@@ -113,131 +1463,362 @@ class DatabaseManager:
             return " AND " + " AND ".join(conditions), params
         return "", []
     
-    # === 例文関連メソッド ===
-    def add_sentence(self, english, japanese, ts):
+    # === 無作為抽出（ORDER BY RANDOM() の全件ソートを避ける） ===
+    def _sample_ids(self, table, k, condition="", params=()):
+        """条件（" AND ..." 形式）に合う行の id を重複なく最大 k 件、無作為に選ぶ
+
+        id の範囲から乱数で候補を引き、実在して条件に合うものだけを採用する（削除済み・対象外は捨てる）。
+        当たりが少なく候補を引きすぎたときは、条件に合う id だけをインデックスから読んでその中から選ぶ。
+        """
+        if k <= 0:
+            return []
+        lo, hi = self.conn.execute(f"SELECT (SELECT MIN(id) FROM {table}), (SELECT MAX(id) FROM {table})").fetchone()
+        if lo is None:
+            return []
+
+        budget = SAMPLE_DRAWS_PER_ROW * k
+        chosen, tried = [], set()
+        if hi - lo + 1 > budget:
+            while len(chosen) < k and len(tried) < budget:
+                # 候補は引いた順のまま使う（set の並びで切り捨てると特定の id が選ばれにくくなる）
+                candidates = []
+                for _ in range((k - len(chosen)) * 2):
+                    candidate = random.randint(lo, hi)
+                    if candidate not in tried:
+                        tried.add(candidate)
+                        candidates.append(candidate)
+                for i in range(0, len(candidates), 500):
+                    chunk = candidates[i:i + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    found = {row[0] for row in self.conn.execute(
+                        f"SELECT id FROM {table} WHERE id IN ({placeholders}){condition}", list(chunk) + list(params))}
+                    for candidate in chunk:
+                        if candidate in found and len(chosen) < k:
+                            chosen.append(candidate)
+            if len(chosen) >= k:
+                random.shuffle(chosen)
+                return chosen
+
+        ids = [row[0] for row in self.conn.execute(f"SELECT id FROM {table} WHERE 1=1{condition}", list(params))]
+        return random.sample(ids, min(k, len(ids)))
+
+    def _fetch_by_ids(self, table, columns, ids):
+        """id の順に行を取得"""
+        rows = {}
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for row in self.conn.execute(f"SELECT id, {columns} FROM {table} WHERE id IN ({placeholders})", chunk):
+                rows[row[0]] = row[1:]
+        return [rows[i] for i in ids if i in rows]
+
+    def _list_page(self, table, columns, sort, descending, after, limit):
+        """リストの1ページ分を並び順のインデックスに沿って取得（キーセット方式）
+
+        after は前のページの最後の行の (並べ替えの値, id)。OFFSET を使わないので何ページ目でも同じ速さ。
+        各行は (columns..., 並べ替えの値)。
+        """
+        key = LIST_SORT_KEYS[table][sort]
+        key_column = key.split()[0]
+        cmp, order = ("<", "DESC") if descending else (">", "ASC")
+        query = f"SELECT {columns}, {key_column} FROM {table}"
+        params = []
+        if after is not None:
+            after_value, after_id = after
+            if sort == "id":
+                query += f" WHERE id {cmp} ?"
+                params = [after_id]
+            else:
+                # 1つ目の条件でインデックスの位置まで飛び、同じ値の行は id で続きを決める
+                query += f" WHERE {key} {cmp}= ? AND ({key} {cmp} ? OR id {cmp} ?)"
+                params = [after_value, after_value, after_id]
+        query += f" ORDER BY {key} {order}" + ("" if sort == "id" else f", id {order}") + " LIMIT ?"
+        return self.conn.execute(query, params + [limit]).fetchall()
+
+    # === 検索 ===
+    def search_list(self, kind, text, limit=SEARCH_LIMIT):
+        """単語・例文を検索してリスト表示用の行を関連度の高い順に返す
+
+        空白で区切った語のうち、かな・漢字を含む語は日本語訳を部分一致で、
+        それ以外の語は英語を単語の前方一致で（"app" → apple, application）探し、すべてに当てはまるものを返す（"apple りんご" なら両方）。
+        3文字未満の日本語は trigram で引けないので、訳の LIKE で絞り込む。
+        """
+        if not self.has_search:
+            return []
+        parity = 0 if kind == "words" else 1
+        if kind == "words":
+            columns, table, japanese = f"t.id, t.english_word, substr(t.japanese_meaning, 1, {LIST_MEANING_CHARS})", "words", "japanese_meaning"
+        else:
+            columns, table, japanese = f"t.id, substr(t.english_sentence, 1, {LIST_SENTENCE_CHARS})", "sentences", "japanese_translation"
+        english_terms, japanese_parts = [], []
+        for token in text.split():
+            if _JAPANESE_CHARS.search(token):
+                japanese_parts.append(token)
+            else:
+                # "café" なども英語として探す（索引はアクセント記号を無視する）
+                english_terms.extend(re.findall(r"[\w']+", unicodedata.normalize("NFKC", token)))
+        long_parts = [part for part in japanese_parts if len(part) >= 3]
+        quote = lambda term: '"' + term.replace('"', '""') + '"'
+
+        if english_terms:
+            index, match = "search_english", " ".join(quote(term) + "*" for term in english_terms)
+            like_parts = japanese_parts
+        elif long_parts:
+            index, match = "search_japanese", " ".join(quote(part) for part in long_parts)
+            like_parts = [part for part in japanese_parts if len(part) < 3]
+        elif japanese_parts:
+            index, like_parts = None, japanese_parts
+        else:
+            return []
+
+        conditions = [f"t.{japanese} LIKE ? ESCAPE '\\'" for _ in like_parts]
+        params = ["%" + escape_like(part) + "%" for part in like_parts]
+        if index is None:
+            # 短い日本語だけなら表を順に見る（短い訳を先に）
+            return self.conn.execute(
+                f"SELECT {columns} FROM {table} t WHERE {' AND '.join(conditions)} ORDER BY length(t.{japanese}) LIMIT ?",
+                params + [limit]).fetchall()
+        extra = "".join(" AND " + condition for condition in conditions)
+        return self.conn.execute(
+            f"SELECT {columns} FROM {index} s JOIN {table} t ON t.id = s.rowid >> 1 "
+            f"WHERE {index} MATCH ? AND s.rowid & 1 = ?{extra} ORDER BY s.rank LIMIT ?",
+            [match, parity] + params + [limit]).fetchall()
+
+    # === 保存（単語・例文共通） ===
+    def save_entry(self, kind, english, japanese, ts):
+        """単語・例文を保存し (リスト表示用の行, 新規なら True) を返す（kind は "words" / "sentences"）
+
+        英語がそのまま同じ項目があれば訳だけを上書きする。なければ english_key の一意インデックスで判定し、
+        大文字・小文字や空白だけ違う英語は同じ項目として、英語と訳を上書きする。
+        書き込めなかったとき（英語がほかの項目と重なる）は (None, False) を返す。
+        """
+        english_col, japanese_col = ("english_word", "japanese_meaning") if kind == "words" else ("english_sentence", "japanese_translation")
+        key = normalize_english_key(english)
+        before = self._change_marker()
         try:
             with self.conn:
-                self.conn.execute("INSERT INTO sentences (english_sentence, japanese_translation, created_at) VALUES (?, ?, ?)", (english, japanese, ts))
-            return True
+                same = self.conn.execute(f"SELECT id FROM {kind} WHERE {english_col} = ?", (english,)).fetchone()
+                if same:
+                    row_id, added = same[0], False
+                    self.conn.execute(f"UPDATE {kind} SET {japanese_col} = ? WHERE id = ?", (japanese, row_id))
+                else:
+                    cursor = self.conn.execute(
+                        f"INSERT INTO {kind} ({english_col}, {japanese_col}, english_key, created_at) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT(english_key) DO NOTHING", (english, japanese, key, ts))
+                    added = cursor.rowcount > 0
+                    if added:
+                        row_id = cursor.lastrowid
+                    else:
+                        row_id = self.conn.execute(f"SELECT id FROM {kind} WHERE english_key = ?", (key,)).fetchone()[0]
+                        self.conn.execute(f"UPDATE {kind} SET {english_col} = ?, {japanese_col} = ? WHERE id = ?", (english, japanese, row_id))
         except sqlite3.IntegrityError:
-            messagebox.showwarning("登録済み", "この英文は既に登録されています。")
-            return False
+            label = "単語" if kind == "words" else "英文"
+            messagebox.showwarning("登録済み", f"この{label}は既に登録されています。")
+            return None, False
+        self._apply_stats_delta(before, kind, 1 if added else 0)
+        list_row = self.get_word_list_row(row_id) if kind == "words" else self.get_sentence_list_row(row_id)
+        return list_row, added
+
+    def _update_entry(self, kind, row_id, english, japanese):
+        """編集した単語・例文を書き込みリスト表示用の行を返す（英語がほかの項目と重なるなら None）
+
+        英語を変えていなければ english_key もそのまま（移行で id 付きのキーになった行も訳を直せる）。
+        """
+        english_col, japanese_col = ("english_word", "japanese_meaning") if kind == "words" else ("english_sentence", "japanese_translation")
+        before = self._change_marker()
+        try:
+            with self.conn:
+                self.conn.execute(
+                    f"UPDATE {kind} SET english_key = CASE WHEN {english_col} = ? THEN english_key ELSE ? END, "
+                    f"{english_col} = ?, {japanese_col} = ? WHERE id = ?",
+                    (english, normalize_english_key(english), english, japanese, row_id))
+        except sqlite3.IntegrityError:
+            label = "単語" if kind == "words" else "英文"
+            messagebox.showwarning("登録済み", f"この{label}は既に登録されています。")
+            return None
+        self._apply_stats_delta(before, kind, 0)
+        return self.get_word_list_row(row_id) if kind == "words" else self.get_sentence_list_row(row_id)
+
+    # === 例文関連メソッド ===
+    def save_sentence(self, english, japanese, ts):
+        """例文を保存（登録済みなら上書き）し (リスト表示用の行, 新規なら True) を返す"""
+        return self.save_entry("sentences", english, japanese, ts)
+
+    def get_sentence_list_row(self, sentence_id):
+        """例文リスト用の1行（get_sentences_page と同じ形）"""
+        return self.conn.execute(
+            f"SELECT id, substr(english_sentence, 1, {LIST_SENTENCE_CHARS}) FROM sentences WHERE id = ?", (sentence_id,)).fetchone()
     
-    def get_all_sentences(self):
-        return self.conn.execute("SELECT id, english_sentence, japanese_translation, created_at FROM sentences ORDER BY created_at DESC").fetchall()
+    def get_sentences_page(self, after=None, limit=LIST_PAGE_SIZE, sort="id", descending=True):
+        """例文リスト用に1ページ分を取得（例文は表示用に短くしてから返す）"""
+        return self._list_page("sentences", f"id, substr(english_sentence, 1, {LIST_SENTENCE_CHARS})",
+                               sort, descending, after, limit)
     
     def delete_sentence(self, sentence_id):
+        """例文を削除（削除できたら True）"""
+        before = self._change_marker()
         with self.conn:
-            self.conn.execute("DELETE FROM sentences WHERE id = ?", (sentence_id,))
+            deleted = self.conn.execute("DELETE FROM sentences WHERE id = ?", (sentence_id,)).rowcount > 0
+        if deleted:
+            self._apply_stats_delta(before, "sentences", -1)
+        return deleted
     
     def get_random_sentences(self, count, start_date=None, end_date=None):
         """日付フィルタ対応版"""
         date_filter, date_params = self._get_date_filter_sql(start_date, end_date)
-        query = f"SELECT english_sentence, japanese_translation FROM sentences WHERE 1=1{date_filter} ORDER BY RANDOM() LIMIT ?"
-        params = date_params + [count]
-        return self.conn.execute(query, params).fetchall()
+        ids = self._sample_ids("sentences", count, date_filter, date_params)
+        return self._fetch_by_ids("sentences", "english_sentence, japanese_translation", ids)
     
     def get_sentence_by_id(self, sentence_id):
         return self.conn.execute("SELECT english_sentence, japanese_translation FROM sentences WHERE id = ?", (sentence_id,)).fetchone()
     
     def update_sentence(self, sentence_id, english, japanese):
-        """例文を更新"""
+        """例文を更新してリスト表示用の行を返す（ほかの例文と重なるなら None）"""
+        return self._update_entry("sentences", sentence_id, english, japanese)
+
+    def add_sentences_bulk(self, pairs, ts):
+        """(英文, 和訳) の組を1トランザクションで追加（登録済みはスキップ）。追加件数を返す"""
         with self.conn:
-            self.conn.execute("UPDATE sentences SET english_sentence = ?, japanese_translation = ? WHERE id = ?", (english, japanese, sentence_id))
+            cursor = self.conn.executemany("INSERT OR IGNORE INTO sentences (english_sentence, japanese_translation, english_key, created_at) VALUES (?, ?, ?, ?)",
+                                  [(english, japanese, normalize_english_key(english), ts) for english, japanese in pairs])
+        return cursor.rowcount  # total_changes だとトリガーでの書き込みも数えてしまう
 
-    def get_sentence_id_by_english(self, english_sentence):
-        """英文から例文IDを取得"""
-        result = self.conn.execute("SELECT id FROM sentences WHERE english_sentence = ?", (english_sentence,)).fetchone()
-        return result[0] if result else None
-    
     def get_sentences_count_by_date(self, start_date=None, end_date=None):
         """日付範囲内の例文数を取得"""
-        date_filter, date_params = self._get_date_filter_sql(start_date, end_date)
-        query = f"SELECT COUNT(*) FROM sentences WHERE 1=1{date_filter}"
-        result = self.conn.execute(query, date_params).fetchone()
-        return result[0] if result else 0
+        return self.get_count_by_date("sentences", start_date, end_date)
     
     # === 単語関連メソッド ===
-    def add_word(self, english, japanese, ts):
-        try:
-            with self.conn:
-                self.conn.execute("INSERT INTO words (english_word, japanese_meaning, created_at) VALUES (?, ?, ?)", (english, japanese, ts))
-            return True
-        except sqlite3.IntegrityError:
-            messagebox.showwarning("登録済み", "この単語は既に登録されています。")
-            return False
+    def save_word(self, english, japanese, ts):
+        """単語を保存（登録済みなら上書き）し (リスト表示用の行, 新規なら True) を返す"""
+        return self.save_entry("words", english, japanese, ts)
+
+    def get_word_list_row(self, word_id):
+        """単語リスト用の1行（get_words_page と同じ形）"""
+        return self.conn.execute(
+            f"SELECT id, english_word, substr(japanese_meaning, 1, {LIST_MEANING_CHARS}) FROM words WHERE id = ?", (word_id,)).fetchone()
     
-    def get_all_words(self):
-        return self.conn.execute("SELECT id, english_word, japanese_meaning, created_at FROM words ORDER BY created_at DESC").fetchall()
+    def get_words_page(self, after=None, limit=LIST_PAGE_SIZE, sort="id", descending=True):
+        """単語リスト用に1ページ分を取得（意味は表示用に短くしてから返す）"""
+        return self._list_page("words", f"id, english_word, substr(japanese_meaning, 1, {LIST_MEANING_CHARS})",
+                               sort, descending, after, limit)
     
     def delete_word(self, word_id):
+        """単語を削除（削除できたら True）"""
+        before = self._change_marker()
         with self.conn:
-            self.conn.execute("DELETE FROM words WHERE id = ?", (word_id,))
+            deleted = self.conn.execute("DELETE FROM words WHERE id = ?", (word_id,)).rowcount > 0
+        if deleted:
+            self._apply_stats_delta(before, "words", -1)
+        return deleted
     
     def get_random_words(self, count, start_date=None, end_date=None):
         """日付フィルタ対応版"""
         date_filter, date_params = self._get_date_filter_sql(start_date, end_date)
-        query = f"SELECT english_word, japanese_meaning FROM words WHERE 1=1{date_filter} ORDER BY RANDOM() LIMIT ?"
-        params = date_params + [count]
-        return self.conn.execute(query, params).fetchall()
+        ids = self._sample_ids("words", count, date_filter, date_params)
+        return self._fetch_by_ids("words", "english_word, japanese_meaning", ids)
     
     def get_word_by_id(self, word_id):
         return self.conn.execute("SELECT english_word, japanese_meaning FROM words WHERE id = ?", (word_id,)).fetchone()
     
     def update_word(self, word_id, english, japanese):
-        """単語を更新"""
+        """単語を更新してリスト表示用の行を返す（ほかの単語と重なるなら None）"""
+        return self._update_entry("words", word_id, english, japanese)
+
+    def add_words_bulk(self, pairs, ts):
+        """(英単語, 意味) の組を1トランザクションで追加（登録済みはスキップ）。追加件数を返す"""
         with self.conn:
-            self.conn.execute("UPDATE words SET english_word = ?, japanese_meaning = ? WHERE id = ?", (english, japanese, word_id))
+            cursor = self.conn.executemany("INSERT OR IGNORE INTO words (english_word, japanese_meaning, english_key, created_at) VALUES (?, ?, ?, ?)",
+                                  [(english, japanese, normalize_english_key(english), ts) for english, japanese in pairs])
+        return cursor.rowcount  # total_changes だとトリガーでの書き込みも数えてしまう
+
+    def get_count_by_date(self, kind, start_date=None, end_date=None):
+        """日付範囲内の件数を登録日ごとの集計（daily_counts）から求める（kind は "words" / "sentences"）"""
+        if not start_date and not end_date:
+            return self.get_stats()[kind]  # 登録日時のない行も含めた全件
+        conditions, params = ["kind = ?"], [kind]
+        if start_date:
+            conditions.append("day >= ?")
+            params.append(start_date.isoformat())
+        if end_date:
+            conditions.append("day <= ?")
+            params.append(end_date.isoformat())
+        query = f"SELECT COALESCE(SUM(count), 0) FROM daily_counts WHERE {' AND '.join(conditions)}"
+        return self.conn.execute(query, params).fetchone()[0]
+
+    def get_registered_day_range(self):
+        """単語・例文が登録された最初の日と最後の日を返す（どちらもなければ None）"""
+        row = self.conn.execute("""
+            SELECT (SELECT MIN(day) FROM daily_counts WHERE kind = 'words'),
+                   (SELECT MIN(day) FROM daily_counts WHERE kind = 'sentences'),
+                   (SELECT MAX(day) FROM daily_counts WHERE kind = 'words'),
+                   (SELECT MAX(day) FROM daily_counts WHERE kind = 'sentences')
+        """).fetchone()
+        oldest = [day for day in row[:2] if day]
+        newest = [day for day in row[2:] if day]
+        to_date = lambda day: datetime.strptime(day, "%Y-%m-%d").date()
+        return (to_date(min(oldest)) if oldest else None), (to_date(max(newest)) if newest else None)
 
-    def get_word_id_by_english(self, english_word):
-        """英単語から単語IDを取得"""
-        result = self.conn.execute("SELECT id FROM words WHERE english_word = ?", (english_word,)).fetchone()
-        return result[0] if result else None
-    
     def get_words_count_by_date(self, start_date=None, end_date=None):
         """日付範囲内の単語数を取得"""
-        date_filter, date_params = self._get_date_filter_sql(start_date, end_date)
-        query = f"SELECT COUNT(*) FROM words WHERE 1=1{date_filter}"
-        result = self.conn.execute(query, date_params).fetchone()
-        return result[0] if result else 0
+        return self.get_count_by_date("words", start_date, end_date)
     
-    def get_random_word_choices(self, exclude_meaning, n):
-        """単語クイズ用の選択肢を取得"""
-        base = exclude_meaning.split(';')[0].strip().lower()
-        base_normalized = base.replace('・', '').replace(' ', '').replace('、', '').replace('。', '')
-        
-        rows = self.conn.execute(
-            "SELECT japanese_meaning FROM words WHERE japanese_meaning != ? ORDER BY RANDOM() LIMIT 50", 
-            (exclude_meaning,)
-        ).fetchall()
-        
-        uniq, seen = [], {base_normalized}
-        
-        for (meaning,) in rows:
-            if not meaning: continue
-            
-            cand = meaning.split(';')[0].strip()
-            if not cand: continue
-            
-            norm = cand.lower().replace('・', '').replace(' ', '').replace('、', '').replace('。', '')
-            
-            if norm in seen or norm == base_normalized: continue
-            if base_normalized in norm or norm in base_normalized: continue
-            if len(norm) < 2: continue
-            
-            uniq.append(cand)
-            seen.add(norm)
-            
-            if len(uniq) >= n: break
-        
-        # 十分な選択肢が取れない場合はダミーを追加
-        while len(uniq) < n:
-            dummy_options = ["該当なし", "不明", "その他", "関連語なし"]
-            for dummy in dummy_options:
-                if dummy not in uniq and len(uniq) < n:
-                    uniq.append(dummy)
-        
-        return uniq[:n]
+    def count_pending_word_grams(self):
+        """n-gram 索引にまだ反映していない単語の数"""
+        return self.conn.execute("SELECT COUNT(*) FROM word_grams_pending").fetchone()[0]
+
+    def refresh_word_grams(self, chunk_size=500, progress=None, cancel_event=None, pause=0):
+        """n-gram 索引のうち、追加・変更・削除があった単語の分だけを作り直す
+
+        chunk_size 件ごとにコミットするので、ワーカースレッドで全件を作り直している間も
+        ほかの接続の書き込みを長く待たせない（pause 秒ずつ空けて、待っている書き込みに順番を譲る）。
+        progress(done, total) があればチャンクごとに呼ぶ。
+        """
+        total = self.count_pending_word_grams()
+        done = 0
+        while not (cancel_event is not None and cancel_event.is_set()):
+            with self.conn:
+                ids = [row[0] for row in self.conn.execute("SELECT word_id FROM word_grams_pending LIMIT ?", (chunk_size,))]
+                if not ids:
+                    break
+                placeholders = ",".join("?" * len(ids))
+                self.conn.execute(f"DELETE FROM word_grams WHERE word_id IN ({placeholders})", ids)
+                rows = self.conn.execute(f"SELECT id, english_word, japanese_meaning FROM words WHERE id IN ({placeholders})", ids)
+                self.conn.executemany("INSERT OR IGNORE INTO word_grams (gram, word_id) VALUES (?, ?)",
+                                      [(gram, word_id) for word_id, english, meaning in rows.fetchall()
+                                       for gram in word_grams(english, meaning)])
+                self.conn.execute(f"DELETE FROM word_grams_pending WHERE word_id IN ({placeholders})", ids)
+            done += len(ids)
+            if progress:
+                progress(min(done, total), total)
+            if pause:
+                time.sleep(pause)
+
+    def get_similar_meanings(self, questions, limit=SIMILAR_CANDIDATES):
+        """問題 [(英単語, 意味), ...] ごとに、綴りか意味が似ている単語の意味を似ている順に返す
+
+        索引から共通する n-gram の多い単語を数えるだけなので、単語どうしを総当たりで比べない。
+        索引は呼び出し側で refresh_word_grams により最新にしておく（未反映の単語は似た単語に出てこない）。
+        """
+        similar = {}
+        for question in questions:
+            english, meaning = question[0], question[1]
+            counts = {}
+            for gram in word_grams(english, meaning):
+                ids = [row[0] for row in self.conn.execute(
+                    "SELECT word_id FROM word_grams WHERE gram = ? LIMIT ?", (gram, SIMILAR_MAX_POSTINGS + 1))]
+                if len(ids) > SIMILAR_MAX_POSTINGS:
+                    continue  # ありふれた n-gram は手がかりにならない
+                for word_id in ids:
+                    counts[word_id] = counts.get(word_id, 0) + 1
+            ranked = sorted(counts, key=counts.get, reverse=True)[:limit + 1]
+            rows = self._fetch_by_ids("words", "english_word, japanese_meaning", ranked)
+            similar[english] = [m for e, m in rows if e != english][:limit]
+        return similar
+
+    def iter_word_meanings(self):
+        """誤答選択肢の候補用に、単語の意味を順に返す"""
+        for (meaning,) in self.conn.execute("SELECT japanese_meaning FROM words"):
+            yield meaning
 
     # === 間違い問題管理メソッド（新規追加） ===
     def add_wrong_question(self, question_type, question_content, correct_answer):
@@ -278,31 +1859,203 @@ class DatabaseManager:
 
     def get_wrong_questions(self, question_type, count=None):
         """間違えた問題を取得"""
+        columns = "question_content, correct_answer, consecutive_correct"
         if count:
-            query = """
-                SELECT question_content, correct_answer, consecutive_correct 
-                FROM wrong_questions 
-                WHERE question_type = ? 
-                ORDER BY RANDOM() 
-                LIMIT ?
-            """
-            return self.conn.execute(query, (question_type, count)).fetchall()
+            ids = self._sample_ids("wrong_questions", count, " AND question_type = ?", (question_type,))
+            return self._fetch_by_ids("wrong_questions", columns, ids)
         else:
-            query = """
-                SELECT question_content, correct_answer, consecutive_correct 
-                FROM wrong_questions 
-                WHERE question_type = ? 
-                ORDER BY RANDOM()
-            """
-            return self.conn.execute(query, (question_type,)).fetchall()
+            rows = self.conn.execute(f"SELECT {columns} FROM wrong_questions WHERE question_type = ?", (question_type,)).fetchall()
+            random.shuffle(rows)
+            return rows
+
+    def import_rows(self, kind, rows, ts, batch_size=IMPORT_BATCH_SIZE, max_conflicts=20):
+        """(英語, 日本語) の行をまとめて登録・更新する（kind は "words" / "sentences"）
+
+        全体を1トランザクションで書き込み、行はバッチごとに executemany で流し込む。
+        登録済み（英語がそのまま同じ項目、なければ english_key が同じ項目）で訳が異なるものは上書きし、
+        その例を conflicts に入れて返す。
+        件数は english_key ごとに1回だけ数える（同じ英語が何度出てきても最初の結果だけ）。
+        """
+        english_col, japanese_col = ("english_word", "japanese_meaning") if kind == "words" else ("english_sentence", "japanese_translation")
+        # 登録済みかどうかは先に english_key で引いているので、追加と更新を別々に流す
+        # （UPSERT の DO UPDATE はトリガー内の INSERT OR IGNORE を無効にしてしまう）
+        insert = f"INSERT INTO {kind} ({english_col}, {japanese_col}, english_key, created_at) VALUES (?, ?, ?, ?)"
+        update = f"UPDATE {kind} SET {japanese_col} = ? WHERE id = ?"
+        added = updated = unchanged = skipped = 0
+        conflicts = []
+        counted = set()  # 件数に数えた english_key
+
+        def flush(batch):
+            nonlocal added, updated, unchanged
+            placeholders = ",".join("?" * len(batch))
+            by_english = {english: (row_id, japanese) for english, row_id, japanese in self.conn.execute(
+                f"SELECT {english_col}, id, {japanese_col} FROM {kind} WHERE {english_col} IN ({placeholders})",
+                [english for english, _ in batch.values()]
+            )}
+            by_key = {key: (row_id, japanese) for key, row_id, japanese in self.conn.execute(
+                f"SELECT english_key, id, {japanese_col} FROM {kind} WHERE english_key IN ({placeholders})", list(batch)
+            )}
+            new_rows, changed_rows = [], []
+            for key, (english, japanese) in batch.items():
+                first_time = key not in counted
+                counted.add(key)
+                existing = by_english.get(english) or by_key.get(key)
+                if existing is None:
+                    added += first_time
+                    new_rows.append((english, japanese, key, ts))
+                elif existing[1] == japanese:
+                    unchanged += first_time
+                else:
+                    updated += first_time
+                    changed_rows.append((japanese, existing[0]))
+                    if len(conflicts) < max_conflicts:
+                        conflicts.append((english, existing[1], japanese))
+            self.conn.executemany(insert, new_rows)
+            self.conn.executemany(update, changed_rows)
+
+        with self.conn:
+            batch = {}
+            for english, japanese in rows:
+                if not english or not japanese:
+                    skipped += 1
+                    continue
+                key = normalize_english_key(english)
+                if key in batch:
+                    # 同じバッチ内の重複は後の訳を採用（英語は最初の行のまま。件数は flush で1回だけ数える）
+                    first_english, first_japanese = batch[key]
+                    if first_japanese != japanese and len(conflicts) < max_conflicts:
+                        conflicts.append((english, first_japanese, japanese))
+                    english = first_english
+                batch[key] = (english, japanese)
+                if len(batch) >= batch_size:
+                    flush(batch)
+                    batch = {}
+            if batch:
+                flush(batch)
+
+        return ImportResult(added, updated, unchanged, skipped, conflicts)
+
+    def iter_export_rows(self, table, start_date=None, end_date=None):
+        """エクスポート用にテーブルの行を順に返す（カーソルから少しずつ読むので全件をメモリに載せない）"""
+        columns = EXPORT_TABLES[table]
+        date_filter, date_params = self._get_date_filter_sql(start_date, end_date)
+        query = f"SELECT {', '.join(columns)} FROM {table} WHERE 1=1{date_filter} ORDER BY created_at"
+        yield from self.conn.execute(query, date_params)
+
+    def filter_unregistered(self, kind, texts, batch_size=500):
+        """まだ登録されていない英語だけを返す（kind は "words" / "sentences"。english_key で判定し、入力内の重複も除く）"""
+        keyed = {}
+        for text in texts:
+            keyed.setdefault(normalize_english_key(text), text)
+        keys = list(keyed)
+        for start in range(0, len(keys), batch_size):
+            batch = keys[start:start + batch_size]
+            placeholders = ",".join("?" * len(batch))
+            for (key,) in self.conn.execute(f"SELECT english_key FROM {kind} WHERE english_key IN ({placeholders})", batch):
+                del keyed[key]
+        return list(keyed.values())
+
+    def iter_tts_texts(self, start_date=None, end_date=None):
+        """音声の一括作成用に、単語と例文の英語を順に返す（日付フィルタ対応）"""
+        date_filter, date_params = self._get_date_filter_sql(start_date, end_date)
+        for query in (f"SELECT english_word FROM words WHERE 1=1{date_filter}",
+                      f"SELECT english_sentence FROM sentences WHERE 1=1{date_filter}"):
+            for (text,) in self.conn.execute(query, date_params):
+                yield text
+
+    # === 翻訳キャッシュ関連メソッド ===
+    def get_cached_translation(self, engine, target_lang, source_text):
+        """キャッシュ済みの翻訳結果を取得（なければNone）"""
+        row = self.conn.execute(
+            "SELECT translated_text FROM translations WHERE engine = ? AND target_lang = ? AND source_key = ?",
+            (engine, target_lang, normalize_translation_key(source_text))
+        ).fetchone()
+        if row:
+            self.translation_cache_stats["hits"] += 1
+            return row[0]
+        self.translation_cache_stats["misses"] += 1
+        return None
+
+    def save_translation(self, engine, target_lang, source_text, translated_text):
+        """翻訳結果をキャッシュに保存"""
+        with self.conn:
+            self.conn.execute("""
+                INSERT OR REPLACE INTO translations (engine, target_lang, source_key, translated_text, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, (engine, target_lang, normalize_translation_key(source_text), translated_text, int(datetime.now().timestamp())))
+
+    def get_cached_translations(self, target_lang, source_keys, chunk_size=500):
+        """正規化済みの原文キーの一覧からキャッシュ済みの翻訳をまとめて取得（DeepLを優先）"""
+        found = {}
+        for i in range(0, len(source_keys), chunk_size):
+            chunk = source_keys[i:i + chunk_size]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(f"""
+                SELECT source_key, translated_text FROM translations
+                WHERE target_lang = ? AND source_key IN ({placeholders})
+                ORDER BY engine = 'deepl'
+            """, [target_lang] + chunk).fetchall()
+            found.update(rows)  # deepl の行が後に来るので上書きされる
+        return found
+
+    def save_translations(self, engine, target_lang, pairs):
+        """(原文, 訳文) の組をまとめて1トランザクションで保存"""
+        ts = int(datetime.now().timestamp())
+        with self.conn:
+            self.conn.executemany("""
+                INSERT OR REPLACE INTO translations (engine, target_lang, source_key, translated_text, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, [(engine, target_lang, normalize_translation_key(source), translated, ts) for source, translated in pairs])
+
+    def get_translation_cache_count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def clear_translation_cache(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM translations")
+
+    # === 統計 ===
+    def _change_marker(self):
+        """DBが書き換えられたかどうかの目印（この接続の変更数と、他の接続のコミットで変わる data_version）"""
+        return self.conn.total_changes, self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def get_stats(self):
+        """単語数・例文数・種類ごとの復習待ち問題数を返す
+
+        1回の集計クエリでまとめて数え、書き込みがあるまでは結果を使い回す。
+        戻り値は {"words": 件数, "sentences": 件数, "wrong": {question_type: 件数}}。
+        """
+        marker = self._change_marker()
+        if self._stats_cache is not None and self._stats_cache[0] == marker:
+            return self._stats_cache[1]
+
+        stats = {"words": 0, "sentences": 0, "wrong": {}}
+        rows = self.conn.execute("""
+            SELECT 'words', NULL, COUNT(*) FROM words
+            UNION ALL
+            SELECT 'sentences', NULL, COUNT(*) FROM sentences
+            UNION ALL
+            SELECT 'wrong', question_type, COUNT(*) FROM wrong_questions GROUP BY question_type
+        """)
+        for kind, question_type, count in rows:
+            if kind == "wrong":
+                stats["wrong"][question_type] = count
+            else:
+                stats[kind] = count
+        self._stats_cache = (marker, stats)
+        return stats
+
+    def _apply_stats_delta(self, before, kind, delta):
+        """1件の追加・削除を集計済みの件数に反映する（書き込み前にキャッシュが最新だったときだけ）"""
+        if self._stats_cache is None or self._stats_cache[0] != before:
+            return
+        stats = self._stats_cache[1]
+        stats[kind] += delta
+        self._stats_cache = (self._change_marker(), stats)
 
     def get_wrong_questions_count(self, question_type):
         """間違えた問題の数を取得"""
-        result = self.conn.execute(
-            "SELECT COUNT(*) FROM wrong_questions WHERE question_type = ?", 
-            (question_type,)
-        ).fetchone()
-        return result[0] if result else 0
+        return self.get_stats()["wrong"].get(question_type, 0)
 
 # --- メインアプリケーションクラス ---
 class App(tk.Tk):
@@ -312,8 +2065,25 @@ class App(tk.Tk):
         self.db_path = config_data.get("db_path", DEFAULT_DB_FILE)
         self.db = DatabaseManager(self.db_path)
         
-        # DeepL翻訳設定
+        # DeepL翻訳設定（クライアントはAPIキーが変わるまで使い回す）
         self.translator = None
+        self.translator_api_key = None
+        self.deepl_split_option = None  # 使えると分かった split_sentences の指定方法
+        self.google_translator = None
+        self.translator_lock = threading.Lock()
+        # 翻訳の通信は Tk スレッドを止めないようにワーカースレッドで行う（長い処理に待たされないよう翻訳ボタン専用）
+        self.translation_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="translate")
+        # 一括翻訳・インポート・エクスポート・索引の作成などの長い処理用
+        self.background_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="background")
+        self.background_cancels = set()  # 実行中の長い処理の中止フラグ（閉じるときにすべて立てる）
+        # 似た単語の n-gram 索引の作成（件数が多いときはワーカースレッドで作り、終わるまでは通常の選択肢）
+        self.word_grams_future = None
+        self.word_grams_cancel = threading.Event()
+        # 音声再生バックエンド、TTS音声キャッシュと合成・再生用のループ（全ウィンドウで共有）
+        self.audio = create_audio_backend(config_data.get("audio_backend", AUDIO_BACKEND_DEFAULT))
+        self.tts_cache = TTSAudioCache() if HAS_TTS else None
+        self.tts = TTSService(self.tts_cache, self.audio) if HAS_TTS else None
+        self.load_effect_sounds()
         # 編集中のアイテムID（新機能）
         self.editing_word_id = None
         self.editing_sentence_id = None
@@ -340,6 +2110,13 @@ class App(tk.Tk):
         file_menu.add_command(label="翻訳設定", command=self.show_deepl_settings)
         file_menu.add_separator()
         file_menu.add_command(label="音声ファイル作成", command=self.create_sound_files)
+        file_menu.add_command(label="読み上げ音声を一括作成", command=self.prerender_deck_audio)
+        file_menu.add_separator()
+        file_menu.add_command(label="単語リストを一括翻訳して登録...", command=lambda: self.bulk_translate_list("words"))
+        file_menu.add_command(label="例文リストを一括翻訳して登録...", command=lambda: self.bulk_translate_list("sentences"))
+        file_menu.add_command(label="単語をインポート（CSV/TSV/Anki）...", command=lambda: self.import_list("words"))
+        file_menu.add_command(label="例文をインポート（CSV/TSV/Anki）...", command=lambda: self.import_list("sentences"))
+        file_menu.add_command(label="エクスポート...", command=self.show_export_dialog)
         file_menu.add_separator()
         file_menu.add_command(label="終了", command=self.on_closing)
 
@@ -347,7 +2124,7 @@ class App(tk.Tk):
         """翻訳設定ダイアログ"""
         dialog = tk.Toplevel(self)
         dialog.title("翻訳設定")
-        dialog.geometry("500x550")
+        dialog.geometry("500x600")
         dialog.transient(self)
         dialog.grab_set()
         
@@ -398,6 +2175,7 @@ Google翻訳について：
             test_text = "An Israeli strike in Gaza City late Sunday night killed seven people including five staff members from the news network Al Jazeera, in an attack condemned by press freedom advocates and the United Nations human rights office."
             
             try:
+                configure_deepl_http()
                 test_translator = deepl.Translator(test_key)
                 
                 # 最新の修正方法でテスト
@@ -429,8 +2207,10 @@ Google翻訳について：
             test_text = "Hello world"
             try:
                 translator = GoogleTranslator(source='en', target='ja')
-                result = translator.translate(test_text)
+                result = call_with_timeout(translator.translate, test_text)
                 messagebox.showinfo("テスト成功", f"Google翻訳は利用可能です！\nテスト結果: {test_text} → {result}")
+            except FutureTimeoutError:
+                messagebox.showerror("テスト失敗", "Google翻訳がタイムアウトしました。")
             except Exception as e:
                 messagebox.showerror("テスト失敗", f"Google翻訳エラー: {e}")
         
@@ -443,37 +2223,120 @@ Google翻訳について：
         
         def save_settings():
             self.config_data["deepl_api_key"] = api_key_var.get().strip()
+            if self.config_data["deepl_api_key"] != self.translator_api_key:
+                self.translator = None
             messagebox.showinfo("設定完了", "翻訳設定が保存されました。")
             dialog.destroy()
         
         ttk.Button(btn_frame, text="保存", command=save_settings).pack(side=tk.LEFT, padx=5)
 
+        # 翻訳キャッシュの状況
+        cache_frame = ttk.Frame(dialog)
+        cache_frame.pack(pady=(0, 10))
+        cache_label = ttk.Label(cache_frame, text="")
+        cache_label.pack(side=tk.LEFT, padx=5)
+
+        def update_cache_label():
+            stats = self.db.translation_cache_stats
+            cache_label.config(text=f"翻訳キャッシュ: {self.db.get_translation_cache_count()}件（ヒット {stats['hits']} / ミス {stats['misses']}）")
+
+        def clear_cache():
+            if messagebox.askyesno("確認", "翻訳キャッシュを削除しますか？", parent=dialog):
+                self.db.clear_translation_cache()
+                update_cache_label()
+
+        ttk.Button(cache_frame, text="キャッシュを削除", command=clear_cache).pack(side=tk.LEFT, padx=5)
+        update_cache_label()
+
     def create_sound_files(self):
         """音声ファイル作成機能"""
         if not HAS_TTS:
             messagebox.showerror("エラー", "edge-ttsライブラリがインストールされていません。\npip install edge-tts を実行してください。")
             return
         
-        def create_files():
+        # 上書きできるように、開いたままの効果音だけを閉じる（読み上げ中の音声は止めない）
+        for name in SOUND_FILES:
+            self.audio.unload(name)
+        future = self.tts.submit(self._create_sound_files_async())
+
+        def poll():
+            if not future.done():
+                self.after(200, poll)
+                return
+            self.load_effect_sounds()
             try:
-                asyncio.run(self._create_sound_files_async())
+                future.result()
                 messagebox.showinfo("作成完了", "音声ファイルが作成されました！\n- sound_correct.mp3 (正解音)\n- sound_incorrect.mp3 (不正解音)")
             except Exception as e:
                 messagebox.showerror("作成失敗", f"音声ファイルの作成に失敗しました: {e}")
-        
-        threading.Thread(target=create_files, daemon=True).start()
+
+        poll()
 
     async def _create_sound_files_async(self):
-        """音声ファイル作成の非同期処理"""
+        """音声ファイル作成の非同期処理（2つを並行して作成）"""
         # 正解音（ピンポン）
         correct_text = "ピンポン！正解です"
         communicate_correct = edge_tts.Communicate(correct_text, "ja-JP-NanamiNeural")
-        await communicate_correct.save("sound_correct.mp3")
         
         # 不正解音（ブー）
         incorrect_text = "ブー！不正解です"
         communicate_incorrect = edge_tts.Communicate(incorrect_text, "ja-JP-KeitaNeural")
-        await communicate_incorrect.save("sound_incorrect.mp3")
+
+        await asyncio.gather(
+            communicate_correct.save("sound_correct.mp3"),
+            communicate_incorrect.save("sound_incorrect.mp3"),
+        )
+
+    def prerender_deck_audio(self):
+        """登録済みの単語・例文の読み上げ音声を一括作成（日付フィルタ対応）"""
+        if not HAS_TTS:
+            messagebox.showerror("エラー", "edge-ttsライブラリがインストールされていません。\npip install edge-tts を実行してください。")
+            return
+
+        start_date, end_date = self.get_current_date_filter()
+        texts = list(self.db.iter_tts_texts(start_date, end_date))
+        if not texts:
+            messagebox.showinfo("一括作成", "対象の単語・例文がありません。")
+            return
+        if not messagebox.askyesno("一括作成の確認", f"{len(texts)}件の読み上げ音声を作成します（作成済みはスキップ）。\nよろしいですか？"):
+            return
+
+        dialog = tk.Toplevel(self)
+        dialog.title("読み上げ音声を一括作成")
+        dialog.geometry("400x120")
+        dialog.transient(self)
+        dialog.resizable(False, False)
+        status_label = ttk.Label(dialog, text="準備中...", font=("", 11))
+        status_label.pack(pady=(15, 5))
+        progress_bar = ttk.Progressbar(dialog, length=350, mode="determinate")
+        progress_bar.pack(pady=5)
+
+        state = {"done": 0, "total": 0, "failed": 0}
+
+        def on_progress(done, total, failed):
+            state.update(done=done, total=total, failed=failed)
+
+        future = self.tts.submit(self.tts_cache.prerender(texts, progress=on_progress))
+
+        def poll():
+            if not dialog.winfo_exists():
+                return
+            total = state["total"]
+            progress_bar.config(maximum=max(total, 1), value=state["done"])
+            status_label.config(text=f"作成中... {state['done']} / {total}（失敗: {state['failed']}）")
+            if not future.done():
+                dialog.after(200, poll)
+                return
+            dialog.destroy()
+            try:
+                result = future.result()
+                messagebox.showinfo("作成完了", f"読み上げ音声を作成しました。\n新規作成: {total - state['failed']}件　失敗: {state['failed']}件")
+                if result["deck_bytes"] > self.tts_cache.max_bytes:
+                    messagebox.showwarning("容量の上限", format_cache_overflow(result["deck_bytes"], self.tts_cache.max_bytes))
+            except Exception as e:
+                messagebox.showerror("作成失敗", f"音声の一括作成に失敗しました: {e}")
+
+        poll()
 
     def create_widgets(self):
         # メインコンテナ
@@ -522,11 +2385,20 @@ Google翻訳について：
         translate_btn_frame = ttk.Frame(eng_frame)
         translate_btn_frame.pack(side=tk.RIGHT)
         
+        self.word_translate_buttons = []
         if HAS_GOOGLE_TRANSLATOR:
-            ttk.Button(translate_btn_frame, text="Google翻訳", command=self.on_google_translate_word).pack(side=tk.RIGHT, padx=(0, 5))
+            btn = ttk.Button(translate_btn_frame, text="Google翻訳", command=self.on_google_translate_word)
+            btn.pack(side=tk.RIGHT, padx=(0, 5))
+            self.word_translate_buttons.append(btn)
         
         if HAS_TRANSLATOR:
-            ttk.Button(translate_btn_frame, text="DeepL翻訳", command=self.on_deepl_translate_word).pack(side=tk.RIGHT)
+            btn = ttk.Button(translate_btn_frame, text="DeepL翻訳", command=self.on_deepl_translate_word)
+            btn.pack(side=tk.RIGHT)
+            self.word_translate_buttons.append(btn)
+
+        # 翻訳中の表示
+        self.word_translate_status = ttk.Label(translate_btn_frame, text="", width=8, foreground="gray")
+        self.word_translate_status.pack(side=tk.RIGHT, padx=(0, 5))
         
         self.entry_word_english = ttk.Entry(left_frame, font=("", 14))
         self.entry_word_english.pack(fill=tk.X, pady=(0, 10))
@@ -547,10 +2419,22 @@ Google翻訳について：
         right_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
         
         ttk.Label(right_frame, text="登録済み単語リスト（クリックで編集）").pack(anchor='w')
+
+        # 検索欄（英語は前方一致、日本語は部分一致。空にすると一覧に戻る）
+        word_search_frame = ttk.Frame(right_frame)
+        word_search_frame.pack(fill=tk.X, pady=(5, 0))
+        ttk.Label(word_search_frame, text="検索:").pack(side=tk.LEFT)
+        self.word_search_var = tk.StringVar()
+        word_search_entry = ttk.Entry(word_search_frame, textvariable=self.word_search_var)
+        word_search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 0))
+        if not self.db.has_search:
+            word_search_entry.config(state="disabled")
+            ttk.Label(word_search_frame, text="（SQLite 3.34 以降で使えます）").pack(side=tk.LEFT, padx=(5, 0))
         
         # TreeView設定
         word_cols = ("ID", "英単語", "日本語")
-        self.word_tree = ttk.Treeview(right_frame, columns=word_cols, show='headings', selectmode='browse')
+        word_tree_frame = ttk.Frame(right_frame)
+        self.word_tree = ttk.Treeview(word_tree_frame, columns=word_cols, show='headings', selectmode='browse')
         for col in word_cols:
             self.word_tree.heading(col, text=col)
         self.word_tree.column("ID", width=50, stretch=tk.NO)
@@ -560,7 +2444,16 @@ Google翻訳について：
         # TreeViewの選択イベントをバインド
         self.word_tree.bind("<<TreeviewSelect>>", self.on_word_select)
         
-        self.word_tree.pack(fill=tk.BOTH, expand=True, pady=5)
+        # スクロールに合わせて少しずつ読み込む（見出しのクリックで並べ替え）
+        word_tree_scroll = ttk.Scrollbar(word_tree_frame, orient=tk.VERTICAL)
+        self.word_list_loader = PagedTreeLoader(self.word_tree, word_tree_scroll, self.db.get_words_page,
+                                                sort_columns={"ID": "id", "英単語": "english", "日本語": "japanese"},
+                                                search=lambda text, limit: self.db.search_list("words", text, limit))
+        self.word_search_var.trace_add("write", lambda *_: self.word_list_loader.search_later(self.word_search_var.get()))
+        
+        word_tree_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.word_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        word_tree_frame.pack(fill=tk.BOTH, expand=True, pady=5)
         
         # リスト操作ボタン
         word_list_btns_frame = ttk.Frame(right_frame)
@@ -590,11 +2483,20 @@ Google翻訳について：
         translate_btn_frame = ttk.Frame(eng_frame)
         translate_btn_frame.pack(side=tk.RIGHT)
         
+        self.sentence_translate_buttons = []
         if HAS_GOOGLE_TRANSLATOR:
-            ttk.Button(translate_btn_frame, text="Google翻訳", command=self.on_google_translate_sentence).pack(side=tk.RIGHT, padx=(0, 5))
+            btn = ttk.Button(translate_btn_frame, text="Google翻訳", command=self.on_google_translate_sentence)
+            btn.pack(side=tk.RIGHT, padx=(0, 5))
+            self.sentence_translate_buttons.append(btn)
         
         if HAS_TRANSLATOR:
-            ttk.Button(translate_btn_frame, text="DeepL翻訳", command=self.on_deepl_translate_sentence).pack(side=tk.RIGHT)
+            btn = ttk.Button(translate_btn_frame, text="DeepL翻訳", command=self.on_deepl_translate_sentence)
+            btn.pack(side=tk.RIGHT)
+            self.sentence_translate_buttons.append(btn)
+
+        # 翻訳中の表示
+        self.sentence_translate_status = ttk.Label(translate_btn_frame, text="", width=8, foreground="gray")
+        self.sentence_translate_status.pack(side=tk.RIGHT, padx=(0, 5))
 
         self.entry_sentence_english = tk.Text(left_frame, height=5, wrap=tk.WORD, font=("", 11))
         self.entry_sentence_english.pack(fill=tk.X, pady=(0, 10))
@@ -615,10 +2517,22 @@ Google翻訳について：
         right_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
         
         ttk.Label(right_frame, text="登録済み例文リスト（クリックで編集）").pack(anchor='w')
+
+        # 検索欄（英語は前方一致、日本語は部分一致。空にすると一覧に戻る）
+        sentence_search_frame = ttk.Frame(right_frame)
+        sentence_search_frame.pack(fill=tk.X, pady=(5, 0))
+        ttk.Label(sentence_search_frame, text="検索:").pack(side=tk.LEFT)
+        self.sentence_search_var = tk.StringVar()
+        sentence_search_entry = ttk.Entry(sentence_search_frame, textvariable=self.sentence_search_var)
+        sentence_search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 0))
+        if not self.db.has_search:
+            sentence_search_entry.config(state="disabled")
+            ttk.Label(sentence_search_frame, text="（SQLite 3.34 以降で使えます）").pack(side=tk.LEFT, padx=(5, 0))
         
         # TreeView設定
         sentence_cols = ("ID", "英語の例文")
-        self.sentence_tree = ttk.Treeview(right_frame, columns=sentence_cols, show='headings', selectmode='browse')
+        sentence_tree_frame = ttk.Frame(right_frame)
+        self.sentence_tree = ttk.Treeview(sentence_tree_frame, columns=sentence_cols, show='headings', selectmode='browse')
         for col in sentence_cols:
             self.sentence_tree.heading(col, text=col)
         self.sentence_tree.column("ID", width=50, stretch=tk.NO)
@@ -627,7 +2541,16 @@ Google翻訳について：
         # TreeViewの選択イベントをバインド
         self.sentence_tree.bind("<<TreeviewSelect>>", self.on_sentence_select)
         
-        self.sentence_tree.pack(fill=tk.BOTH, expand=True, pady=5)
+        # スクロールに合わせて少しずつ読み込む（見出しのクリックで並べ替え）
+        sentence_tree_scroll = ttk.Scrollbar(sentence_tree_frame, orient=tk.VERTICAL)
+        self.sentence_list_loader = PagedTreeLoader(self.sentence_tree, sentence_tree_scroll, self.db.get_sentences_page,
+                                                    sort_columns={"ID": "id", "英語の例文": "english"},
+                                                    search=lambda text, limit: self.db.search_list("sentences", text, limit))
+        self.sentence_search_var.trace_add("write", lambda *_: self.sentence_list_loader.search_later(self.sentence_search_var.get()))
+        
+        sentence_tree_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.sentence_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        sentence_tree_frame.pack(fill=tk.BOTH, expand=True, pady=5)
         
         # リスト操作ボタン
         sentence_list_btns_frame = ttk.Frame(right_frame)
@@ -694,6 +2617,15 @@ Google翻訳について：
         self.word_quiz_count = tk.IntVar(value=10)
         vcmd1 = (self.register(lambda P: str.isdigit(P) or P == ""), '%P')
         ttk.Entry(word_common_frame, textvariable=self.word_quiz_count, width=5, validate='key', validatecommand=vcmd1).pack(side=tk.LEFT, padx=(0, 20))
+
+        # 難しい選択肢（綴りや意味が似た単語を誤答に使う）
+        self.hard_distractors_var = tk.BooleanVar(value=self.config_data.get("hard_distractors", False))
+        ttk.Checkbutton(word_common_frame, text="4択で似た単語を選択肢にする（難しい）", variable=self.hard_distractors_var,
+                        command=self.on_toggle_hard_distractors).pack(side=tk.LEFT)
+        self.word_grams_status = ttk.Label(word_common_frame, text="")
+        self.word_grams_status.pack(side=tk.LEFT, padx=(5, 0))
+        if self.hard_distractors_var.get():
+            self.after_idle(self.ensure_word_grams)
         
         # クイズ形式選択ボタン
         word_quiz_buttons = ttk.Frame(word_quiz_frame)
@@ -747,24 +2679,17 @@ Google翻訳について：
         if not HAS_CALENDAR:
             return
         # データベースから最古と最新の日付を取得
-        oldest_word = self.db.conn.execute("SELECT MIN(created_at) FROM words").fetchone()[0]
-        oldest_sentence = self.db.conn.execute("SELECT MIN(created_at) FROM sentences").fetchone()[0]
-        newest_word = self.db.conn.execute("SELECT MAX(created_at) FROM words").fetchone()[0]
-        newest_sentence = self.db.conn.execute("SELECT MAX(created_at) FROM sentences").fetchone()[0]
-        
-        # 最古と最新を決定
-        oldest = min(filter(None, [oldest_word, oldest_sentence])) if any([oldest_word, oldest_sentence]) else None
-        newest = max(filter(None, [newest_word, newest_sentence])) if any([newest_word, newest_sentence]) else None
+        oldest, newest = self.db.get_registered_day_range()
         
         if oldest:
-            self.start_date_entry.set_date(datetime.fromtimestamp(oldest).date())
+            self.start_date_entry.set_date(oldest)
             self.filter_start_date = None  # 全期間の場合はNone
         else:
             self.start_date_entry.set_date(datetime.now().date() - timedelta(days=365))
             self.filter_start_date = None
             
         if newest:
-            self.end_date_entry.set_date(datetime.fromtimestamp(newest).date())
+            self.end_date_entry.set_date(newest)
             self.filter_end_date = None  # 全期間の場合はNone
         else:
             self.end_date_entry.set_date(datetime.now().date())
@@ -862,13 +2787,15 @@ Google翻訳について：
 
     def update_stats(self):
         """学習統計を更新"""
-        word_count = len(self.db.get_all_words())
-        sentence_count = len(self.db.get_all_sentences())
+        # 件数はまとめて集計し、DBが変わるまでキャッシュを使う
+        stats = self.db.get_stats()
+        word_count = stats["words"]
+        sentence_count = stats["sentences"]
         
         # 間違い問題の数も取得
-        wrong_word_choice_count = self.db.get_wrong_questions_count('word_choice')
-        wrong_word_listening_count = self.db.get_wrong_questions_count('word_listening')
-        wrong_sentence_count = self.db.get_wrong_questions_count('sentence')
+        wrong_word_choice_count = stats["wrong"].get('word_choice', 0)
+        wrong_word_listening_count = stats["wrong"].get('word_listening', 0)
+        wrong_sentence_count = stats["wrong"].get('sentence', 0)
         
         stats_text = f"""全体統計:
 ・登録済み単語: {word_count}個
@@ -904,7 +2831,7 @@ Google翻訳について：
 
     # === 翻訳関連メソッド（★修正：DeepLとGoogle翻訳を分離） ===
     def translate_deepl(self, text):
-        """DeepL翻訳を使用（カンマ問題修正版）"""
+        """DeepL翻訳を使用（カンマ問題修正版）※通信するためワーカースレッドから呼ぶ"""
         if not text:
             return None
         
@@ -916,46 +2843,12 @@ Google翻訳について：
             return "（DeepL APIキーが設定されていません。メニューから「翻訳設定」でAPIキーを設定してください）"
         
         try:
-            translator = deepl.Translator(deepl_api_key)
+            translator = self.get_deepl_translator(deepl_api_key)
             
             # テキストの前処理
-            cleaned_text = text.strip()
-            cleaned_text = re.sub(r'\r\n', '\n', cleaned_text)
-            cleaned_text = re.sub(r'\n\s*\n', '\n', cleaned_text)
-            cleaned_text = re.sub(r'[ \t]+', ' ', cleaned_text)
+            cleaned_text = clean_translation_text(text)
             
-            # 方法1: enumを使用（最新版の場合）
-            try:
-                if hasattr(deepl, 'SplitSentences'):
-                    result = translator.translate_text(
-                        cleaned_text, 
-                        target_lang="JA",
-                        split_sentences=deepl.SplitSentences.OFF,
-                        preserve_formatting=True
-                    )
-                    return str(result)
-            except:
-                pass
-            
-            # 方法2: 文字列指定
-            try:
-                result = translator.translate_text(
-                    cleaned_text, 
-                    target_lang="JA",
-                    split_sentences="off",
-                    preserve_formatting=True
-                )
-                return str(result)
-            except:
-                pass
-            
-            # 方法3: 数値指定
-            result = translator.translate_text(
-                cleaned_text, 
-                target_lang="JA",
-                split_sentences=0
-            )
-            return str(result)
+            return self._deepl_translate_text(translator, cleaned_text)
                 
         except deepl.QuotaExceededException:
             return "（DeepL APIの月間制限に達しました）"
@@ -964,8 +2857,54 @@ Google翻訳について：
         except Exception as e:
             return f"（DeepL翻訳に失敗しました: {e}）"
 
+    def get_deepl_translator(self, api_key):
+        """DeepLクライアントを取得（APIキーが変わったときだけ作り直す）"""
+        with self.translator_lock:
+            if self.translator is None or self.translator_api_key != api_key:
+                configure_deepl_http()
+                self.translator = deepl.Translator(api_key)
+                self.translator_api_key = api_key
+                self.deepl_split_option = None
+            return self.translator
+
+    def _deepl_split_options(self):
+        """split_sentences の指定方法の候補（ライブラリのバージョン差を吸収）"""
+        options = []
+        # 方法1: enumを使用（最新版の場合）
+        if hasattr(deepl, 'SplitSentences'):
+            options.append({"split_sentences": deepl.SplitSentences.OFF, "preserve_formatting": True})
+        # 方法2: 文字列指定
+        options.append({"split_sentences": "off", "preserve_formatting": True})
+        # 方法3: 数値指定
+        options.append({"split_sentences": 0})
+        return options
+
+    def _deepl_translate_text(self, translator, cleaned_text):
+        """DeepL で翻訳（使える指定方法は最初の1回で判定して覚えておく）
+
+        cleaned_text にリストを渡すと1回のリクエストでまとめて翻訳し、訳文のリストを返す。
+        """
+        def to_text(result):
+            return [str(r) for r in result] if isinstance(cleaned_text, list) else str(result)
+
+        if self.deepl_split_option is not None:
+            return to_text(translator.translate_text(cleaned_text, target_lang="JA", **self.deepl_split_option))
+
+        options = self._deepl_split_options()
+        for i, option in enumerate(options):
+            try:
+                result = translator.translate_text(cleaned_text, target_lang="JA", **option)
+            except deepl.DeepLException:
+                raise  # 通信・認証・上限のエラーは指定方法を変えても同じ
+            except Exception:
+                if i == len(options) - 1:
+                    raise
+                continue
+            self.deepl_split_option = option
+            return to_text(result)
+
     def translate_google(self, text):
-        """Google翻訳を使用（deep-translator）"""
+        """Google翻訳を使用（deep-translator）※通信するためワーカースレッドから呼ぶ"""
         if not text:
             return None
         
@@ -974,19 +2913,257 @@ Google翻訳について：
         
         try:
             # テキストの前処理
-            cleaned_text = text.strip()
-            cleaned_text = re.sub(r'\r\n', '\n', cleaned_text)
-            cleaned_text = re.sub(r'\n\s*\n', '\n', cleaned_text)
-            cleaned_text = re.sub(r'[ \t]+', ' ', cleaned_text)
+            cleaned_text = clean_translation_text(text)
             
-            # Google翻訳を実行
-            translator = GoogleTranslator(source='en', target='ja')
-            result = translator.translate(cleaned_text)
-            return result
+            # Google翻訳を実行（クライアントは使い回す）
+            with self.translator_lock:
+                if self.google_translator is None:
+                    self.google_translator = GoogleTranslator(source='en', target='ja')
+            # deep-translator は通信のタイムアウトを指定できないので、別スレッドで待ち時間を区切る
+            return call_with_timeout(self.google_translator.translate, cleaned_text)
                 
+        except FutureTimeoutError:
+            return "（Google翻訳がタイムアウトしました。時間をおいて再度お試しください）"
         except Exception as e:
             return f"（Google翻訳に失敗しました: {e}）"
 
+    def request_translation(self, engine, text, on_result, buttons, status_label):
+        """翻訳をバックグラウンドで実行し、結果を Tk スレッドで on_result に渡す
+
+        キャッシュにあれば即座に返す。実行中はボタンを無効化して進行表示を出し、
+        TRANSLATION_TIMEOUT_MS を過ぎたら結果を待たずにエラーとする。
+        """
+        cached = self.db.get_cached_translation(engine, "JA", text)
+        if cached is not None:
+            on_result(cached)
+            return
+
+        remote = self.translate_deepl if engine == "deepl" else self.translate_google
+        future = self.translation_executor.submit(remote, text)
+        started = time.monotonic()
+        for btn in buttons:
+            btn.config(state="disabled")
+
+        def finish():
+            for btn in buttons:
+                if btn.winfo_exists():
+                    btn.config(state="normal")
+            if status_label.winfo_exists():
+                status_label.config(text="")
+
+        def poll(tick=0):
+            if not future.done():
+                if (time.monotonic() - started) * 1000 >= TRANSLATION_TIMEOUT_MS:
+                    # 実行中の通信は取り消せないが、TRANSLATION_NETWORK_TIMEOUT で打ち切られてワーカーは空く
+                    future.cancel()
+                    finish()
+                    messagebox.showerror("翻訳エラー", "翻訳がタイムアウトしました。時間をおいて再度お試しください。")
+                    return
+                status_label.config(text="翻訳中" + "." * (tick % 4))
+                self.after(100, poll, tick + 1)
+                return
+
+            finish()
+            try:
+                result = future.result()
+            except Exception as e:
+                result = f"（翻訳中にエラーが発生しました: {e}）"
+            if result and not is_translation_error(result):
+                self.db.save_translation(engine, "JA", text, result)
+            on_result(result)
+
+        poll()
+
+    def _show_translation(self, text_widget, translated_text):
+        """翻訳結果を入力欄に反映（エラーならメッセージを表示）"""
+        if is_translation_error(translated_text):
+            messagebox.showerror("翻訳エラー", translated_text)
+        elif translated_text:
+            text_widget.delete("1.0", tk.END)
+            text_widget.insert("1.0", translated_text)
+
+    def bulk_translate_list(self, kind):
+        """テキストファイル（1行1件）の単語・例文をまとめて翻訳して登録"""
+        label = "単語" if kind == "words" else "例文"
+        deepl_api_key = self.config_data.get("deepl_api_key", "").strip()
+        use_deepl = HAS_TRANSLATOR and bool(deepl_api_key)
+        if not use_deepl and not HAS_GOOGLE_TRANSLATOR:
+            messagebox.showerror("エラー", "翻訳に使えるライブラリがありません。\nDeepL APIキーを設定するか、pip install deep-translator を実行してください。")
+            return
+
+        path = filedialog.askopenfilename(title=f"{label}リストを選択（1行に1件）",
+                                          filetypes=[("テキストファイル", "*.txt"), ("すべてのファイル", "*.*")])
+        if not path:
+            return
+        try:
+            texts = self.db.filter_unregistered(kind, read_text_list(path))
+        except (OSError, UnicodeDecodeError) as e:
+            messagebox.showerror("読み込みエラー", f"ファイルを読み込めませんでした: {e}")
+            return
+        if not texts:
+            messagebox.showinfo("一括翻訳", f"未登録の{label}がありません。")
+            return
+        if not messagebox.askyesno("一括翻訳の確認", f"未登録の{label} {len(texts)}件を翻訳して登録します（翻訳済みはキャッシュを使用）。\nよろしいですか？"):
+            return
+
+        dialog = tk.Toplevel(self)
+        dialog.title(f"{label}リストを一括翻訳")
+        dialog.geometry("400x120")
+        dialog.transient(self)
+        dialog.resizable(False, False)
+        status_label = ttk.Label(dialog, text="準備中...", font=("", 11))
+        status_label.pack(pady=(15, 5))
+        progress_bar = ttk.Progressbar(dialog, length=350, mode="determinate")
+        progress_bar.pack(pady=5)
+
+        state = {"done": 0, "total": len(texts)}
+        cancel_event = threading.Event()
+        self.background_cancels.add(cancel_event)
+        dialog.protocol("WM_DELETE_WINDOW", lambda: (cancel_event.set(), dialog.destroy()))
+
+        def on_progress(done, total):
+            state.update(done=done, total=total)
+
+        def job():
+            # SQLite の接続はスレッドをまたげないので、ワーカー専用の接続を使う
+            db = DatabaseManager(self.db_path)
+            try:
+                bulk = BulkTranslator(
+                    db,
+                    deepl_translate=(lambda batch: self._deepl_translate_text(self.get_deepl_translator(deepl_api_key), batch)) if use_deepl else None,
+                    google_translate=self.translate_google if HAS_GOOGLE_TRANSLATOR else None,
+                )
+                results = bulk.translate(texts, progress=on_progress, cancel_event=cancel_event)
+                pairs = [(text, results[text]) for text in texts if text in results]
+                ts = int(datetime.now().timestamp())
+                added = db.add_words_bulk(pairs, ts) if kind == "words" else db.add_sentences_bulk(pairs, ts)
+                return added, bulk.stats
+            finally:
+                db.close()
+
+        future = self.background_executor.submit(job)
+
+        def poll():
+            if dialog.winfo_exists():
+                progress_bar.config(maximum=max(state["total"], 1), value=state["done"])
+                status_label.config(text=f"翻訳中... {state['done']} / {state['total']}")
+            if not future.done():
+                self.after(200, poll)
+                return
+            self.background_cancels.discard(cancel_event)
+            if dialog.winfo_exists():
+                dialog.destroy()
+            try:
+                added, stats = future.result()
+            except Exception as e:
+                messagebox.showerror("一括翻訳エラー", f"一括翻訳に失敗しました: {e}")
+                return
+            self.refresh_all_lists()
+            messagebox.showinfo("一括翻訳完了",
+                                f"{label}を{added}件登録しました。\n"
+                                f"DeepL: {stats['deepl']}件　Google: {stats['google']}件　キャッシュ: {stats['cached']}件　失敗: {stats['failed']}件")
+
+        poll()
+
+    def import_list(self, kind):
+        """CSV / TSV / Anki の書き出しファイルから単語・例文をインポート"""
+        label = "単語" if kind == "words" else "例文"
+        path = filedialog.askopenfilename(title=f"{label}をインポート（1列目: 英語、2列目: 日本語）",
+                                          filetypes=[("CSV / TSV / Anki", "*.csv *.tsv *.txt *.gz"), ("すべてのファイル", "*.*")])
+        if not path:
+            return
+
+        cancel_event = threading.Event()
+        self.background_cancels.add(cancel_event)
+
+        def rows():
+            for row in iter_import_rows(path):
+                if cancel_event.is_set():
+                    # アプリを閉じたら途中でやめる（トランザクションごと取り消す）
+                    raise InterruptedError("インポートを中止しました")
+                yield row
+
+        def job():
+            db = DatabaseManager(self.db_path)  # ワーカー専用の接続
+            try:
+                return db.import_rows(kind, rows(), int(datetime.now().timestamp()))
+            finally:
+                db.close()
+
+        self.config(cursor="watch")
+        future = self.background_executor.submit(job)
+
+        def poll():
+            if not future.done():
+                self.after(100, poll)
+                return
+            self.background_cancels.discard(cancel_event)
+            self.config(cursor="")
+            try:
+                result = future.result()
+            except (OSError, UnicodeDecodeError, csv.Error, sqlite3.Error) as e:
+                messagebox.showerror("インポートエラー", f"インポートに失敗しました（何も登録されていません）: {e}")
+                return
+            self.refresh_all_lists()
+            messagebox.showinfo("インポート完了", format_import_result(label, result))
+
+        poll()
+
+    def show_export_dialog(self):
+        """単語・例文・間違えた問題のエクスポート"""
+        dialog = tk.Toplevel(self)
+        dialog.title("エクスポート")
+        dialog.geometry("360x220")
+        dialog.transient(self)
+        dialog.resizable(False, False)
+
+        format_var = tk.StringVar(value="csv")
+        gzip_var = tk.BooleanVar(value=False)
+        filter_var = tk.BooleanVar(value=False)
+
+        format_frame = ttk.Frame(dialog)
+        format_frame.pack(pady=(15, 5))
+        ttk.Label(format_frame, text="形式:").pack(side=tk.LEFT, padx=5)
+        ttk.Radiobutton(format_frame, text="CSV", variable=format_var, value="csv").pack(side=tk.LEFT, padx=5)
+        ttk.Radiobutton(format_frame, text="JSONL", variable=format_var, value="jsonl").pack(side=tk.LEFT, padx=5)
+        ttk.Checkbutton(dialog, text="gzip で圧縮する", variable=gzip_var).pack(pady=5)
+        ttk.Checkbutton(dialog, text="クイズの日付フィルタで絞り込む", variable=filter_var).pack(pady=5)
+
+        def run_export():
+            out_dir = filedialog.askdirectory(title="エクスポート先のフォルダを選択", parent=dialog)
+            if not out_dir:
+                return
+            start_date, end_date = self.get_current_date_filter() if filter_var.get() else (None, None)
+            fmt, compress = format_var.get(), gzip_var.get()
+            dialog.destroy()
+
+            def job():
+                db = DatabaseManager(self.db_path)  # ワーカー専用の接続
+                try:
+                    return export_deck(db, out_dir, fmt, compress, start_date, end_date)
+                finally:
+                    db.close()
+
+            self.config(cursor="watch")
+            future = self.background_executor.submit(job)
+
+            def poll():
+                if not future.done():
+                    self.after(100, poll)
+                    return
+                self.config(cursor="")
+                try:
+                    results = future.result()
+                except (OSError, sqlite3.Error) as e:
+                    messagebox.showerror("エクスポートエラー", f"エクスポートに失敗しました: {e}")
+                    return
+                summary = "\n".join(f"{os.path.basename(path)}: {count}件" for path, count in results.values())
+                messagebox.showinfo("エクスポート完了", f"{out_dir} に書き出しました。\n{summary}")
+
+            poll()
+
+        ttk.Button(dialog, text="フォルダを選んで書き出す", command=run_export).pack(pady=15)
+
     # === 単語関連メソッド ===
     def on_deepl_translate_word(self):
         """単語DeepL翻訳ボタンが押されたときの処理"""
@@ -995,15 +3172,9 @@ Google翻訳について：
             messagebox.showwarning("入力エラー", "翻訳する単語を入力してください。")
             return
         
-        try:
-            translated_text = self.translate_deepl(word_text)
-            if translated_text and translated_text.startswith("（") and translated_text.endswith("）"):
-                messagebox.showerror("翻訳エラー", translated_text)
-            else:
-                self.entry_word_japanese.delete("1.0", tk.END)
-                self.entry_word_japanese.insert("1.0", translated_text)
-        except Exception as e:
-            messagebox.showerror("翻訳エラー", f"翻訳中にエラーが発生しました。\n{e}")
+        self.request_translation("deepl", word_text,
+                                 lambda result: self._show_translation(self.entry_word_japanese, result),
+                                 self.word_translate_buttons, self.word_translate_status)
 
     def on_google_translate_word(self):
         """単語Google翻訳ボタンが押されたときの処理"""
@@ -1012,15 +3183,9 @@ Google翻訳について：
             messagebox.showwarning("入力エラー", "翻訳する単語を入力してください。")
             return
         
-        try:
-            translated_text = self.translate_google(word_text)
-            if translated_text and translated_text.startswith("（") and translated_text.endswith("）"):
-                messagebox.showerror("翻訳エラー", translated_text)
-            else:
-                self.entry_word_japanese.delete("1.0", tk.END)
-                self.entry_word_japanese.insert("1.0", translated_text)
-        except Exception as e:
-            messagebox.showerror("翻訳エラー", f"翻訳中にエラーが発生しました。\n{e}")
+        self.request_translation("google", word_text,
+                                 lambda result: self._show_translation(self.entry_word_japanese, result),
+                                 self.word_translate_buttons, self.word_translate_status)
 
     def on_save_word(self):
         """単語保存・更新"""
@@ -1033,29 +3198,26 @@ Google翻訳について：
         
         if self.editing_word_id:
             # 更新処理
-            self.db.update_word(self.editing_word_id, english, japanese)
+            row = self.db.update_word(self.editing_word_id, english, japanese)
+            if not row:
+                return
             operation = "更新"
             self.editing_word_id = None
             self.word_edit_label.config(text="")
         else:
-            # 既存チェック
-            existing_id = self.db.get_word_id_by_english(english)
-            if existing_id:
-                # 既存単語の更新
-                self.db.update_word(existing_id, english, japanese)
-                operation = "更新"
-            else:
-                # 新規追加
-                if not self.db.add_word(english, japanese, int(datetime.now().timestamp())):
-                    return
-                operation = "保存"
+            # 新規追加（登録済みの単語なら上書き）
+            row, added = self.db.save_word(english, japanese, int(datetime.now().timestamp()))
+            if row is None:
+                return
+            operation = "保存" if added else "更新"
         
         # 入力フィールドをクリア
         self.entry_word_english.delete(0, tk.END)
         self.entry_word_japanese.delete("1.0", tk.END)
         
-        # リストを更新
-        self.refresh_word_list()
+        # リストは変わった1行だけ反映（新規は先頭に追加）
+        if row:
+            self.word_list_loader.upsert_row(row, at_top=(operation == "保存"))
         self.update_stats()
         
         # ポップアップは表示しない
@@ -1103,18 +3265,13 @@ Google翻訳について：
         item_values = self.word_tree.item(selected_item, 'values')
         if messagebox.askyesno("削除の確認", f"以下の単語を削除しますか？\n\n{item_values[1]} → {item_values[2]}"):
             self.db.delete_word(item_values[0])
-            self.refresh_word_list()
+            self.word_list_loader.remove_row(item_values[0])
             self.on_clear_word_inputs()
             self.update_stats()
 
     def refresh_word_list(self):
-        """単語リスト更新"""
-        for item in self.word_tree.get_children():
-            self.word_tree.delete(item)
-        
-        for row in self.db.get_all_words():
-            # row = (id, english_word, japanese_meaning, created_at)
-            self.word_tree.insert("", tk.END, values=(row[0], row[1], row[2][:30]))
+        """単語リスト更新（先頭のページだけ読み直し、続きはスクロールに合わせて読み込む）"""
+        self.word_list_loader.reset()
 
     # === 例文関連メソッド ===
     def on_deepl_translate_sentence(self):
@@ -1124,15 +3281,9 @@ Google翻訳について：
             messagebox.showwarning("入力エラー", "翻訳する英文を入力してください。")
             return
         
-        try:
-            translated_text = self.translate_deepl(sentence_text)
-            if translated_text and translated_text.startswith("（") and translated_text.endswith("）"):
-                messagebox.showerror("翻訳エラー", translated_text)
-            else:
-                self.entry_sentence_japanese.delete("1.0", tk.END)
-                self.entry_sentence_japanese.insert("1.0", translated_text)
-        except Exception as e:
-            messagebox.showerror("翻訳エラー", f"翻訳中にエラーが発生しました。\n{e}")
+        self.request_translation("deepl", sentence_text,
+                                 lambda result: self._show_translation(self.entry_sentence_japanese, result),
+                                 self.sentence_translate_buttons, self.sentence_translate_status)
 
     def on_google_translate_sentence(self):
         """例文Google翻訳ボタンが押されたときの処理"""
@@ -1141,15 +3292,9 @@ Google翻訳について：
             messagebox.showwarning("入力エラー", "翻訳する英文を入力してください。")
             return
         
-        try:
-            translated_text = self.translate_google(sentence_text)
-            if translated_text and translated_text.startswith("（") and translated_text.endswith("）"):
-                messagebox.showerror("翻訳エラー", translated_text)
-            else:
-                self.entry_sentence_japanese.delete("1.0", tk.END)
-                self.entry_sentence_japanese.insert("1.0", translated_text)
-        except Exception as e:
-            messagebox.showerror("翻訳エラー", f"翻訳中にエラーが発生しました。\n{e}")
+        self.request_translation("google", sentence_text,
+                                 lambda result: self._show_translation(self.entry_sentence_japanese, result),
+                                 self.sentence_translate_buttons, self.sentence_translate_status)
 
     def on_save_sentence(self):
         """例文保存・更新"""
@@ -1162,29 +3307,26 @@ Google翻訳について：
         
         if self.editing_sentence_id:
             # 更新処理
-            self.db.update_sentence(self.editing_sentence_id, english, japanese)
+            row = self.db.update_sentence(self.editing_sentence_id, english, japanese)
+            if not row:
+                return
             operation = "更新"
             self.editing_sentence_id = None
             self.sentence_edit_label.config(text="")
         else:
-            # 既存チェック
-            existing_id = self.db.get_sentence_id_by_english(english)
-            if existing_id:
-                # 既存例文の更新
-                self.db.update_sentence(existing_id, english, japanese)
-                operation = "更新"
-            else:
-                # 新規追加
-                if not self.db.add_sentence(english, japanese, int(datetime.now().timestamp())):
-                    return
-                operation = "保存"
+            # 新規追加（登録済みの例文なら上書き）
+            row, added = self.db.save_sentence(english, japanese, int(datetime.now().timestamp()))
+            if row is None:
+                return
+            operation = "保存" if added else "更新"
         
         # 入力フィールドをクリア
         self.entry_sentence_english.delete("1.0", tk.END)
         self.entry_sentence_japanese.delete("1.0", tk.END)
         
-        # リストを更新
-        self.refresh_sentence_list()
+        # リストは変わった1行だけ反映（新規は先頭に追加）
+        if row:
+            self.sentence_list_loader.upsert_row(row, at_top=(operation == "保存"))
         self.update_stats()
         
         # ポップアップは表示しない
@@ -1232,17 +3374,13 @@ Google翻訳について：
         item_values = self.sentence_tree.item(selected_item, 'values')
         if messagebox.askyesno("削除の確認", f"以下の例文を削除しますか？\n\n{item_values[1]}"):
             self.db.delete_sentence(item_values[0])
-            self.refresh_sentence_list()
+            self.sentence_list_loader.remove_row(item_values[0])
             self.on_clear_sentence_inputs()
             self.update_stats()
 
     def refresh_sentence_list(self):
-        """例文リスト更新"""
-        for item in self.sentence_tree.get_children():
-            self.sentence_tree.delete(item)
-        
-        for row in self.db.get_all_sentences():
-            self.sentence_tree.insert("", tk.END, values=(row[0], row[1]))
+        """例文リスト更新（先頭のページだけ読み直し、続きはスクロールに合わせて読み込む）"""
+        self.sentence_list_loader.reset()
 
     def refresh_all_lists(self):
         """全リスト更新"""
@@ -1274,7 +3412,7 @@ Google翻訳について：
             messagebox.showinfo("クイズ中止", "4択クイズには最低4つの単語が必要です。")
             return
         
-        WordQuizChoiceWindow(self, questions)
+        WordQuizChoiceWindow(self, self.create_choice_session(questions, 'word_choice'))
 
     def on_word_quiz_listening(self):
         """単語クイズ（リスニング形式）開始"""
@@ -1326,7 +3464,7 @@ Google翻訳について：
             messagebox.showinfo("復習なし", "復習対象の単語4択問題がありません。")
             return
         
-        WrongWordQuizChoiceWindow(self, questions)
+        WrongWordQuizChoiceWindow(self, self.create_choice_session(questions, 'word_choice'))
 
     def on_wrong_word_quiz_listening(self):
         """間違えた単語クイズ（リスニング形式）開始"""
@@ -1346,8 +3484,96 @@ Google翻訳について：
         
         WrongSentenceQuizWindow(self, questions)
 
+    def load_effect_sounds(self):
+        """正解・不正解の効果音を起動時に一度だけ読み込む"""
+        for name, filename in SOUND_FILES.items():
+            path = find_resource(filename)
+            if not path:
+                continue
+            try:
+                self.audio.preload(name, path)
+            except Exception as e:
+                print(f"Sound preload error ({filename}): {e}")
+
+    def play_effect(self, name):
+        """効果音を再生（"correct" / "incorrect"）"""
+        try:
+            self.audio.play_preloaded(name)
+        except Exception as e:
+            print(f"Sound playback error: {e}")
+
+    def create_choice_session(self, rows, question_type):
+        """4択クイズ1回分をまとめて作成（「似た選択肢」がオンで索引ができていれば似た単語を誤答に使う）"""
+        hard = self.hard_distractors_var.get() and self.ensure_word_grams()
+        return build_choice_session(self.db, rows, question_type, hard=hard)
+
+    def on_toggle_hard_distractors(self):
+        self.config_data["hard_distractors"] = self.hard_distractors_var.get()
+        if self.hard_distractors_var.get():
+            self.ensure_word_grams()
+
+    def ensure_word_grams(self):
+        """似た単語の索引が使えるなら True
+
+        未反映の単語が少なければその場で更新し、多ければワーカースレッドで作り始めて False を返す
+        （Tk スレッドを止めない。作り終わるまでの4択は通常の選択肢になる）。
+        """
+        if self.word_grams_future is not None:
+            return False
+        pending = self.db.count_pending_word_grams()
+        if pending <= WORD_GRAMS_INLINE_LIMIT:
+            if pending:
+                self.db.refresh_word_grams()
+            return True
+
+        state = {"done": 0, "total": pending}
+
+        def on_progress(done, total):
+            state.update(done=done, total=total)
+
+        def job():
+            # SQLite の接続はスレッドをまたげないので、ワーカー専用の接続を使う
+            db = DatabaseManager(self.db_path)
+            try:
+                db.refresh_word_grams(progress=on_progress, cancel_event=self.word_grams_cancel, pause=WORD_GRAMS_CHUNK_PAUSE)
+            finally:
+                db.close()
+
+        self.word_grams_future = self.background_executor.submit(job)
+
+        def poll():
+            if not self.word_grams_future.done():
+                self.word_grams_status.config(text=f"（似た単語の索引を作成中... {state['done']} / {state['total']}）")
+                self.after(500, poll)
+                return
+            try:
+                self.word_grams_future.result()
+                self.word_grams_status.config(text="")
+            except Exception as e:
+                print(f"Word grams refresh error: {e}")
+                self.word_grams_status.config(text="（似た単語の索引を作成できませんでした）")
+            self.word_grams_future = None
+
+        poll()
+        return False
+
+    def create_tts_prefetcher(self, texts):
+        """クイズ用の音声先読みを作成（TTSが無効ならNone）"""
+        if not HAS_TTS or self.tts is None:
+            return None
+        return TTSPrefetcher(self.tts, texts)
+
     def on_closing(self):
         save_config(self.config_data)
+        if self.tts:
+            self.tts.close()
+        self.audio.close()
+        # 長い処理を止め、まだ始まっていないものは取り消す（終了時に Python がワーカーの終わりを待つため）
+        self.word_grams_cancel.set()
+        for cancel_event in self.background_cancels:
+            cancel_event.set()
+        self.translation_executor.shutdown(wait=False, cancel_futures=True)
+        self.background_executor.shutdown(wait=False, cancel_futures=True)
         self.db.close()
         self.destroy()
 
@@ -1355,14 +3581,17 @@ Google翻訳について：
 
 # --- 単語クイズウィンドウクラス（4択形式｜間違い記録対応版） ---
 class WordQuizChoiceWindow(tk.Toplevel):
-    def __init__(self, master, questions):
+    def __init__(self, master, session):
         super().__init__(master)
         self.master_app = master
-        self.questions = questions
-        self.total_questions = len(questions)
+        self.session = session
+        self.questions = session.questions  # 選択肢まで作成済み
+        # 次の問題の音声を先読み
+        self.prefetcher = master.create_tts_prefetcher([q.english for q in self.questions])
+        self.total_questions = len(self.questions)
         self.current_q_index = 0
         self.score = 0
-        self.is_speaking = False
+        self.speech_future = None
 
         # ★追加：間違い復習用リストとボタン参照
         self.wrongs = []           # [(english_word, correct_meaning), ...]
@@ -1400,48 +3629,18 @@ class WordQuizChoiceWindow(tk.Toplevel):
         self.next_btn = ttk.Button(self, text="次の問題へ", command=self.show_next_question, state="disabled")
         self.next_btn.pack(pady=10)
 
-    def _play_sound(self, sound_path):
-        """音声ファイル再生（非ブロッキング）"""
-        try:
-            winmm = ctypes.windll.winmm
-            alias = f"sound_{random.randint(1000,9999)}"
-            path_abs = os.path.abspath(sound_path)
-            winmm.mciSendStringW(f'open "{path_abs}" alias {alias}', None, 0, None)
-            winmm.mciSendStringW(f'play {alias}', None, 0, None)
-            self.after(1500, lambda: winmm.mciSendStringW(f'close {alias}', None, 0, None))
-        except Exception as e:
-            print(f"Sound playback error: {e}")
-
-    def _speak_task(self, text_to_say):
-        async def _task():
-            try:
-                self.is_speaking = True
-                communicate = edge_tts.Communicate(text_to_say, TTS_VOICE)
-                await communicate.save(AUDIO_FILE_PATH)
-                self._play_sound(AUDIO_FILE_PATH)
-            except Exception as e:
-                print(f"TTS Error: {e}")
-            finally:
-                self.is_speaking = False
-                if os.path.exists(AUDIO_FILE_PATH):
-                    try:
-                        os.remove(AUDIO_FILE_PATH)
-                    except OSError as e:
-                        print(f"Error removing audio file: {e}")
-
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        loop.run_until_complete(_task())
+    def is_speaking(self):
+        return self.speech_future is not None and not self.speech_future.done()
 
     def speak_current_word(self):
-        if HAS_TTS and not self.is_speaking:
+        if HAS_TTS and not self.is_speaking():
             word_to_say = self.word_label.cget("text")
-            threading.Thread(target=self._speak_task, args=(word_to_say,), daemon=True).start()
+            self.speech_future = self.master_app.tts.speak(word_to_say)
 
     def show_next_question(self):
+        if HAS_TTS:
+            self.master_app.tts.cancel_speech()  # 前の問題の読み上げが残っていれば取り消す
+
         if self.current_q_index >= self.total_questions:
             self.show_final_score()
             return
@@ -1459,36 +3658,15 @@ class WordQuizChoiceWindow(tk.Toplevel):
         self.word_label.config(text=word_to_show)
         self.speak_current_word()
 
-        # 選択肢生成
-        choices = self.master_app.db.get_random_word_choices(self.correct_answer, 3)
-        all_choices = [self.correct_answer] + choices
-
-        # 重複除去
-        unique_choices = []
-        seen = set()
-        for choice in all_choices:
-            normalized = choice.lower().replace('・', '').replace(' ', '').replace('、', '').replace('。', '')
-            if normalized not in seen and choice.strip():
-                unique_choices.append(choice)
-                seen.add(normalized)
-
-        # 4つ確保
-        while len(unique_choices) < 4:
-            dummy_options = ["該当なし", "不明", "その他", "関連語なし"]
-            for dummy in dummy_options:
-                if dummy not in unique_choices:
-                    unique_choices.append(dummy)
-                    break
-
-        unique_choices = unique_choices[:4]
-        random.shuffle(unique_choices)
-
-        # ボタン作成
-        for i, choice in enumerate(unique_choices):
+        # ボタン作成（選択肢はセッション作成時にシャッフル済み）
+        for i, choice in enumerate(q.choices):
             btn = ttk.Button(self.btn_frame, text=f"{chr(65+i)}. {choice}",
                              command=lambda c=choice: self.check_answer(c))
             btn.pack(fill=tk.X, pady=8, padx=50, ipady=10)
 
+        if self.prefetcher:
+            self.prefetcher.advance(self.current_q_index)
+
         self.current_q_index += 1
 
     def check_answer(self, choice):
@@ -1497,18 +3675,17 @@ class WordQuizChoiceWindow(tk.Toplevel):
         if is_correct:
             self.score += 1
             self.feedback_var.set("✅ 正解！")
-            sound_file = SOUND_FILES["correct"]
+            sound_name = "correct"
         else:
             self.feedback_var.set(f"❌ 不正解。正解は「{self.correct_answer}」")
-            sound_file = SOUND_FILES["incorrect"]
+            sound_name = "incorrect"
             # ★追加：間違いを記録（表示中の英単語と正解の意味）
             self.wrongs.append((self.word_label.cget("text"), self.correct_answer))
             # データベースにも記録
             self.master_app.db.add_wrong_question('word_choice', self.word_label.cget("text"), self.correct_answer)
 
         # 効果音再生
-        if os.path.exists(sound_file):
-            threading.Thread(target=self._play_sound, args=(sound_file,), daemon=True).start()
+        self.master_app.play_effect(sound_name)
 
         for btn in self.btn_frame.winfo_children():
             btn.config(state="disabled")
@@ -1542,6 +3719,10 @@ class WordQuizChoiceWindow(tk.Toplevel):
         WordReviewWindow(self, self.wrongs)
 
     def on_closing(self):
+        if HAS_TTS:
+            self.master_app.tts.cancel_speech()
+        if self.prefetcher:
+            self.prefetcher.close()
         self.destroy()
 
 
@@ -1551,9 +3732,11 @@ class WordQuizListeningWindow(tk.Toplevel):
         super().__init__()
         self.master_app = master
         self.questions = questions
+        # 次の問題の音声を先読み
+        self.prefetcher = master.create_tts_prefetcher([q[0] for q in questions])
         self.total = len(questions)
         self.current_idx = 0
-        self.is_speaking = False
+        self.speech_future = None
         self.score = 0            # 正答数
         self.wrongs = []          # ★追加：間違えた問題の [(word, meaning), ...]
         self.review_btn = None    # 終了時の復習ボタン参照
@@ -1601,6 +3784,9 @@ class WordQuizListeningWindow(tk.Toplevel):
         self.next_btn.pack(side=tk.LEFT, expand=True, padx=5, ipady=5)
 
     def show_next_question(self):
+        if HAS_TTS:
+            self.master_app.tts.cancel_speech()  # 前の問題の読み上げが残っていれば取り消す
+
         if self.current_idx >= self.total:
             self.word_label.config(text="クイズ終了！")
             self.meaning_label.config(text=f"全{self.total}問お疲れ様でした。最終結果：{self.total} 問中 {self.score} 問正解")
@@ -1639,6 +3825,9 @@ class WordQuizListeningWindow(tk.Toplevel):
         if HAS_TTS:
             self.speak_current_word()
 
+        if self.prefetcher:
+            self.prefetcher.advance(self.current_idx)
+
         self.current_idx += 1
 
     def show_answer(self):
@@ -1652,16 +3841,15 @@ class WordQuizListeningWindow(tk.Toplevel):
         if is_correct:
             self.score += 1
             self.judge_feedback.config(text="✅ 正解として記録しました")
-            sound_file = SOUND_FILES["correct"]
+            sound_name = "correct"
         else:
             # ★追加：間違いを記録
             self.wrongs.append((self.current_word, self.current_meaning))
             self.master_app.db.add_wrong_question('word_listening', self.current_word, self.current_meaning)
             self.judge_feedback.config(text="❌ 不正解として記録しました")
-            sound_file = SOUND_FILES["incorrect"]
+            sound_name = "incorrect"
 
-        if os.path.exists(sound_file):
-            self._play_sound(sound_file)
+        self.master_app.play_effect(sound_name)
 
         self.correct_btn.config(state="disabled")
         self.wrong_btn.config(state="disabled")
@@ -1672,51 +3860,19 @@ class WordQuizListeningWindow(tk.Toplevel):
         # 復習ウィンドウを開く（間違えた単語のみ）
         WordReviewWindow(self, self.wrongs)
 
-    def _play_sound(self, sound_path, duration_ms=1500):
-        try:
-            winmm = ctypes.windll.winmm
-            alias = f"se_{random.randint(1000,9999)}"
-            path_abs = os.path.abspath(sound_path)
-            winmm.mciSendStringW(f'open "{path_abs}" type mpegvideo alias {alias}', None, 0, None)
-            winmm.mciSendStringW(f'play {alias}', None, 0, None)
-            self.after(duration_ms, lambda: winmm.mciSendStringW(f'close {alias}', None, 0, None))
-        except Exception as e:
-            print(f"Sound playback error: {e}")
-
     # --- 既存のTTS処理 ---
-    def _speak_task(self, text):
-        async def _task():
-            try:
-                self.is_speaking = True
-                communicate = edge_tts.Communicate(text, TTS_VOICE)
-                await communicate.save(AUDIO_FILE_PATH)
-                winmm = ctypes.windll.winmm
-                alias = f"speech_{random.randint(1000,9999)}"
-                path_abs = os.path.abspath(AUDIO_FILE_PATH)
-                winmm.mciSendStringW(f'open "{path_abs}" type mpegvideo alias {alias}', None, 0, None)
-                winmm.mciSendStringW(f'play {alias} wait', None, 0, None)
-                winmm.mciSendStringW(f'close {alias}', None, 0, None)
-            except Exception as e:
-                print(f"TTS Error: {e}")
-            finally:
-                self.is_speaking = False
-                if os.path.exists(AUDIO_FILE_PATH):
-                    try:
-                        os.remove(AUDIO_FILE_PATH)
-                    except OSError:
-                        pass
-        try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        loop.run_until_complete(_task())
+    def is_speaking(self):
+        return self.speech_future is not None and not self.speech_future.done()
 
     def speak_current_word(self):
-        if HAS_TTS and not self.is_speaking:
-            threading.Thread(target=self._speak_task, args=(self.current_word,), daemon=True).start()
+        if HAS_TTS and not self.is_speaking():
+            self.speech_future = self.master_app.tts.speak(self.current_word)
 
     def on_closing(self):
+        if HAS_TTS:
+            self.master_app.tts.cancel_speech()
+        if self.prefetcher:
+            self.prefetcher.close()
         self.destroy()
 
 
@@ -1726,9 +3882,11 @@ class SentenceQuizWindow(tk.Toplevel):
         super().__init__()
         self.master_app = master
         self.questions = questions
+        # 次の問題の音声を先読み
+        self.prefetcher = master.create_tts_prefetcher([q[0] for q in questions])
         self.total = len(questions)
         self.current_idx = 0
-        self.is_speaking = False
+        self.speech_future = None
         self.score = 0
         self.wrongs = []          # ★追加：間違いリスト
         self.review_btn = None
@@ -1776,6 +3934,9 @@ class SentenceQuizWindow(tk.Toplevel):
         self.next_btn.pack(side=tk.LEFT, expand=True, padx=5, ipady=5)
 
     def show_next_question(self):
+        if HAS_TTS:
+            self.master_app.tts.cancel_speech()  # 前の問題の読み上げが残っていれば取り消す
+
         if self.current_idx >= self.total:
             self.english_label.config(text="クイズ終了！")
             self.japanese_label.config(text=f"全{self.total}問お疲れ様でした。最終結果：{self.total} 問中 {self.score} 問正解")
@@ -1814,6 +3975,9 @@ class SentenceQuizWindow(tk.Toplevel):
         if HAS_TTS:
             self.speak_current_sentence()
 
+        if self.prefetcher:
+            self.prefetcher.advance(self.current_idx)
+
         self.current_idx += 1
 
     def show_answer(self):
@@ -1827,16 +3991,15 @@ class SentenceQuizWindow(tk.Toplevel):
         if is_correct:
             self.score += 1
             self.judge_feedback.config(text="✅ 正解として記録しました")
-            sound_file = SOUND_FILES["correct"]
+            sound_name = "correct"
         else:
             # ★追加：間違いを記録
             self.wrongs.append((self.current_english, self.current_japanese))
             self.master_app.db.add_wrong_question('sentence', self.current_english, self.current_japanese)
             self.judge_feedback.config(text="❌ 不正解として記録しました")
-            sound_file = SOUND_FILES["incorrect"]
+            sound_name = "incorrect"
 
-        if os.path.exists(sound_file):
-            self._play_sound(sound_file)
+        self.master_app.play_effect(sound_name)
 
         self.correct_btn.config(state="disabled")
         self.wrong_btn.config(state="disabled")
@@ -1847,66 +4010,37 @@ class SentenceQuizWindow(tk.Toplevel):
         # 復習ウィンドウを開く（間違えた例文のみ）
         SentenceReviewWindow(self, self.wrongs)
 
-    def _play_sound(self, sound_path, duration_ms=1500):
-        try:
-            winmm = ctypes.windll.winmm
-            alias = f"se_{random.randint(1000,9999)}"
-            path_abs = os.path.abspath(sound_path)
-            winmm.mciSendStringW(f'open "{path_abs}" type mpegvideo alias {alias}', None, 0, None)
-            winmm.mciSendStringW(f'play {alias}', None, 0, None)
-            self.after(duration_ms, lambda: winmm.mciSendStringW(f'close {alias}', None, 0, None))
-        except Exception as e:
-            print(f"Sound playback error: {e}")
-
     # --- 既存のTTS処理 ---
-    def _speak_task(self, text):
-        async def _task():
-            try:
-                self.is_speaking = True
-                communicate = edge_tts.Communicate(text, TTS_VOICE)
-                await communicate.save(AUDIO_FILE_PATH)
-                winmm = ctypes.windll.winmm
-                alias = f"speech_{random.randint(1000,9999)}"
-                path_abs = os.path.abspath(AUDIO_FILE_PATH)
-                winmm.mciSendStringW(f'open "{path_abs}" type mpegvideo alias {alias}', None, 0, None)
-                winmm.mciSendStringW(f'play {alias} wait', None, 0, None)
-                winmm.mciSendStringW(f'close {alias}', None, 0, None)
-            except Exception as e:
-                print(f"TTS Error: {e}")
-            finally:
-                self.is_speaking = False
-                if os.path.exists(AUDIO_FILE_PATH):
-                    try:
-                        os.remove(AUDIO_FILE_PATH)
-                    except OSError:
-                        pass
-        try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        loop.run_until_complete(_task())
+    def is_speaking(self):
+        return self.speech_future is not None and not self.speech_future.done()
 
     def speak_current_sentence(self):
-        if HAS_TTS and not self.is_speaking:
-            threading.Thread(target=self._speak_task, args=(self.current_english,), daemon=True).start()
+        if HAS_TTS and not self.is_speaking():
+            self.speech_future = self.master_app.tts.speak(self.current_english)
 
     def on_closing(self):
+        if HAS_TTS:
+            self.master_app.tts.cancel_speech()
+        if self.prefetcher:
+            self.prefetcher.close()
         self.destroy()
 
 # === 間違い復習専用クイズウィンドウクラス（新規追加） ===
 
 # --- 間違い単語クイズ（4択形式）---
 class WrongWordQuizChoiceWindow(tk.Toplevel):
-    def __init__(self, master, questions):
+    def __init__(self, master, session):
         super().__init__(master)
         self.master_app = master
-        self.questions = list(questions)  # [(question_content, correct_answer, consecutive_correct), ...]
-        self.total_questions = len(questions)
+        self.session = session
+        self.questions = session.questions  # 出題順（DBから無作為な順で取得済み）と選択肢まで作成済み
+        self.total_questions = len(self.questions)
         self.current_q_index = 0
         self.score = 0
-        self.is_speaking = False
+        self.speech_future = None
         self.used_questions = set()  # 既に出題した問題を記録
+        # 次の問題の音声を先読み
+        self.prefetcher = master.create_tts_prefetcher([q.english for q in self.questions])
 
         self.title("間違い復習：単語4択クイズ")
         self.geometry("600x520")
@@ -1940,52 +4074,23 @@ class WrongWordQuizChoiceWindow(tk.Toplevel):
         self.next_btn = ttk.Button(self, text="次の問題へ", command=self.show_next_question, state="disabled")
         self.next_btn.pack(pady=10)
 
-    def _play_sound(self, sound_path):
-        """音声ファイル再生（非ブロッキング）"""
-        try:
-            winmm = ctypes.windll.winmm
-            alias = f"sound_{random.randint(1000,9999)}"
-            path_abs = os.path.abspath(sound_path)
-            winmm.mciSendStringW(f'open "{path_abs}" alias {alias}', None, 0, None)
-            winmm.mciSendStringW(f'play {alias}', None, 0, None)
-            self.after(1500, lambda: winmm.mciSendStringW(f'close {alias}', None, 0, None))
-        except Exception as e:
-            print(f"Sound playback error: {e}")
-
-    def _speak_task(self, text_to_say):
-        async def _task():
-            try:
-                self.is_speaking = True
-                communicate = edge_tts.Communicate(text_to_say, TTS_VOICE)
-                await communicate.save(AUDIO_FILE_PATH)
-                self._play_sound(AUDIO_FILE_PATH)
-            except Exception as e:
-                print(f"TTS Error: {e}")
-            finally:
-                self.is_speaking = False
-                if os.path.exists(AUDIO_FILE_PATH):
-                    try:
-                        os.remove(AUDIO_FILE_PATH)
-                    except OSError as e:
-                        print(f"Error removing audio file: {e}")
-
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        loop.run_until_complete(_task())
+    def is_speaking(self):
+        return self.speech_future is not None and not self.speech_future.done()
 
     def speak_current_word(self):
-        if HAS_TTS and not self.is_speaking:
+        if HAS_TTS and not self.is_speaking():
             word_to_say = self.word_label.cget("text")
-            threading.Thread(target=self._speak_task, args=(word_to_say,), daemon=True).start()
+            self.speech_future = self.master_app.tts.speak(word_to_say)
 
     def show_next_question(self):
-        # 利用可能な問題をフィルタリング（まだ出題していない問題）
-        available_questions = [q for i, q in enumerate(self.questions) if i not in self.used_questions]
-        
-        if not available_questions:
+        if HAS_TTS:
+            self.master_app.tts.cancel_speech()  # 前の問題の読み上げが残っていれば取り消す
+
+        # 次に出題する問題（まだ出題していない問題）
+        next_index = len(self.used_questions)
+        remaining = len(self.questions) - next_index
+
+        if remaining <= 0:
             self.show_final_score()
             return
 
@@ -1994,46 +4099,23 @@ class WrongWordQuizChoiceWindow(tk.Toplevel):
         for btn in self.btn_frame.winfo_children():
             btn.destroy()
 
-        # ランダムに1つ選択
-        q = random.choice(available_questions)
+        # シャッフル済みの順に1つ選択
+        q = self.questions[next_index]
         # 使用済みに追加
-        original_index = self.questions.index(q)
-        self.used_questions.add(original_index)
+        self.used_questions.add(next_index)
+        if self.prefetcher:
+            self.prefetcher.advance(next_index)
         
         self.current_question = q[0]  # 英単語
         self.correct_answer = q[1]   # 正解
         self.consecutive_correct = q[2]  # 連続正解数
 
-        self.progress_var.set(f"復習中... 残り問題: {len(available_questions)-1} (連続正解: {self.consecutive_correct})")
+        self.progress_var.set(f"復習中... 残り問題: {remaining-1} (連続正解: {self.consecutive_correct})")
         self.word_label.config(text=self.current_question)
         self.speak_current_word()
 
-        # 選択肢生成
-        choices = self.master_app.db.get_random_word_choices(self.correct_answer, 3)
-        all_choices = [self.correct_answer] + choices
-
-        # 重複除去
-        unique_choices = []
-        seen = set()
-        for choice in all_choices:
-            normalized = choice.lower().replace('・', '').replace(' ', '').replace('、', '').replace('。', '')
-            if normalized not in seen and choice.strip():
-                unique_choices.append(choice)
-                seen.add(normalized)
-
-        # 4つ確保
-        while len(unique_choices) < 4:
-            dummy_options = ["該当なし", "不明", "その他", "関連語なし"]
-            for dummy in dummy_options:
-                if dummy not in unique_choices:
-                    unique_choices.append(dummy)
-                    break
-
-        unique_choices = unique_choices[:4]
-        random.shuffle(unique_choices)
-
-        # ボタン作成
-        for i, choice in enumerate(unique_choices):
+        # ボタン作成（選択肢はセッション作成時にシャッフル済み）
+        for i, choice in enumerate(q.choices):
             btn = ttk.Button(self.btn_frame, text=f"{chr(65+i)}. {choice}",
                              command=lambda c=choice: self.check_answer(c))
             btn.pack(fill=tk.X, pady=8, padx=50, ipady=10)
@@ -2046,18 +4128,17 @@ class WrongWordQuizChoiceWindow(tk.Toplevel):
         if is_correct:
             self.score += 1
             self.feedback_var.set("✅ 正解！")
-            sound_file = SOUND_FILES["correct"]
+            sound_name = "correct"
             # データベースの正解カウントを更新
             self.master_app.db.update_wrong_question_score('word_choice', self.current_question, True)
         else:
             self.feedback_var.set(f"❌ 不正解。正解は「{self.correct_answer}」")
-            sound_file = SOUND_FILES["incorrect"]
+            sound_name = "incorrect"
             # データベースの正解カウントをリセット
             self.master_app.db.update_wrong_question_score('word_choice', self.current_question, False)
 
         # 効果音再生
-        if os.path.exists(sound_file):
-            threading.Thread(target=self._play_sound, args=(sound_file,), daemon=True).start()
+        self.master_app.play_effect(sound_name)
 
         for btn in self.btn_frame.winfo_children():
             btn.config(state="disabled")
@@ -2080,6 +4161,10 @@ class WrongWordQuizChoiceWindow(tk.Toplevel):
         self.master_app.update_stats()
 
     def on_closing(self):
+        if HAS_TTS:
+            self.master_app.tts.cancel_speech()
+        if self.prefetcher:
+            self.prefetcher.close()
         self.destroy()
 
 
@@ -2089,11 +4174,14 @@ class WrongWordQuizListeningWindow(tk.Toplevel):
         super().__init__()
         self.master_app = master
         self.questions = list(questions)  # [(question_content, correct_answer, consecutive_correct), ...]
+        random.shuffle(self.questions)  # 出題順を先に決めておき、音声を先読みできるようにする
         self.total = len(questions)
         self.current_idx = 0
-        self.is_speaking = False
+        self.speech_future = None
         self.score = 0
         self.used_questions = set()
+        # 次の問題の音声を先読み
+        self.prefetcher = master.create_tts_prefetcher([q[0] for q in self.questions])
 
         self.title("間違い復習：単語リスニングクイズ")
         self.geometry("740x460")
@@ -2138,10 +4226,14 @@ class WrongWordQuizListeningWindow(tk.Toplevel):
         self.next_btn.pack(side=tk.LEFT, expand=True, padx=5, ipady=5)
 
     def show_next_question(self):
-        # 利用可能な問題をフィルタリング（まだ出題していない問題）
-        available_questions = [q for i, q in enumerate(self.questions) if i not in self.used_questions]
-        
-        if not available_questions:
+        if HAS_TTS:
+            self.master_app.tts.cancel_speech()  # 前の問題の読み上げが残っていれば取り消す
+
+        # 次に出題する問題（まだ出題していない問題）
+        next_index = len(self.used_questions)
+        remaining = len(self.questions) - next_index
+
+        if remaining <= 0:
             self.word_label.config(text="復習完了！")
             self.meaning_label.config(text=f"復習終了：{self.current_idx - 1} 問取り組み、{self.score} 問正解")
             self.answer_btn.config(state="disabled")
@@ -2155,17 +4247,18 @@ class WrongWordQuizListeningWindow(tk.Toplevel):
             self.master_app.update_stats()
             return
 
-        # ランダムに1つ選択
-        q = random.choice(available_questions)
+        # シャッフル済みの順に1つ選択
+        q = self.questions[next_index]
         # 使用済みに追加
-        original_index = self.questions.index(q)
-        self.used_questions.add(original_index)
+        self.used_questions.add(next_index)
+        if self.prefetcher:
+            self.prefetcher.advance(next_index)
         
         self.current_word = q[0]  # 英単語
         self.current_meaning = q[1]  # 正解
         self.consecutive_correct = q[2]  # 連続正解数
 
-        self.progress_label.config(text=f"復習中... 残り問題: {len(available_questions)-1} (連続正解: {self.consecutive_correct})")
+        self.progress_label.config(text=f"復習中... 残り問題: {remaining-1} (連続正解: {self.consecutive_correct})")
         self.word_label.config(text=self.current_word)
         self.meaning_label.config(text="（下に日本語の意味が表示されます）")
         self.judge_feedback.config(text="")
@@ -2193,66 +4286,33 @@ class WrongWordQuizListeningWindow(tk.Toplevel):
         if is_correct:
             self.score += 1
             self.judge_feedback.config(text="✅ 正解として記録しました")
-            sound_file = SOUND_FILES["correct"]
+            sound_name = "correct"
             # データベースの正解カウントを更新
             self.master_app.db.update_wrong_question_score('word_listening', self.current_word, True)
         else:
             self.judge_feedback.config(text="❌ 不正解として記録しました")
-            sound_file = SOUND_FILES["incorrect"]
+            sound_name = "incorrect"
             # データベースの正解カウントをリセット
             self.master_app.db.update_wrong_question_score('word_listening', self.current_word, False)
 
-        if os.path.exists(sound_file):
-            self._play_sound(sound_file)
+        self.master_app.play_effect(sound_name)
 
         self.correct_btn.config(state="disabled")
         self.wrong_btn.config(state="disabled")
         self.next_btn.config(state="normal")
 
-    def _play_sound(self, sound_path, duration_ms=1500):
-        try:
-            winmm = ctypes.windll.winmm
-            alias = f"se_{random.randint(1000,9999)}"
-            path_abs = os.path.abspath(sound_path)
-            winmm.mciSendStringW(f'open "{path_abs}" type mpegvideo alias {alias}', None, 0, None)
-            winmm.mciSendStringW(f'play {alias}', None, 0, None)
-            self.after(duration_ms, lambda: winmm.mciSendStringW(f'close {alias}', None, 0, None))
-        except Exception as e:
-            print(f"Sound playback error: {e}")
-
-    def _speak_task(self, text):
-        async def _task():
-            try:
-                self.is_speaking = True
-                communicate = edge_tts.Communicate(text, TTS_VOICE)
-                await communicate.save(AUDIO_FILE_PATH)
-                winmm = ctypes.windll.winmm
-                alias = f"speech_{random.randint(1000,9999)}"
-                path_abs = os.path.abspath(AUDIO_FILE_PATH)
-                winmm.mciSendStringW(f'open "{path_abs}" type mpegvideo alias {alias}', None, 0, None)
-                winmm.mciSendStringW(f'play {alias} wait', None, 0, None)
-                winmm.mciSendStringW(f'close {alias}', None, 0, None)
-            except Exception as e:
-                print(f"TTS Error: {e}")
-            finally:
-                self.is_speaking = False
-                if os.path.exists(AUDIO_FILE_PATH):
-                    try:
-                        os.remove(AUDIO_FILE_PATH)
-                    except OSError:
-                        pass
-        try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        loop.run_until_complete(_task())
+    def is_speaking(self):
+        return self.speech_future is not None and not self.speech_future.done()
 
     def speak_current_word(self):
-        if HAS_TTS and not self.is_speaking:
-            threading.Thread(target=self._speak_task, args=(self.current_word,), daemon=True).start()
+        if HAS_TTS and not self.is_speaking():
+            self.speech_future = self.master_app.tts.speak(self.current_word)
 
     def on_closing(self):
+        if HAS_TTS:
+            self.master_app.tts.cancel_speech()
+        if self.prefetcher:
+            self.prefetcher.close()
         self.destroy()
 
 
@@ -2262,11 +4322,14 @@ class WrongSentenceQuizWindow(tk.Toplevel):
         super().__init__()
         self.master_app = master
         self.questions = list(questions)  # [(question_content, correct_answer, consecutive_correct), ...]
+        random.shuffle(self.questions)  # 出題順を先に決めておき、音声を先読みできるようにする
         self.total = len(questions)
         self.current_idx = 0
-        self.is_speaking = False
+        self.speech_future = None
         self.score = 0
         self.used_questions = set()
+        # 次の問題の音声を先読み
+        self.prefetcher = master.create_tts_prefetcher([q[0] for q in self.questions])
 
         self.title("間違い復習：例文リスニングクイズ")
         self.geometry("760x480")
@@ -2311,10 +4374,14 @@ class WrongSentenceQuizWindow(tk.Toplevel):
         self.next_btn.pack(side=tk.LEFT, expand=True, padx=5, ipady=5)
 
     def show_next_question(self):
-        # 利用可能な問題をフィルタリング（まだ出題していない問題）
-        available_questions = [q for i, q in enumerate(self.questions) if i not in self.used_questions]
-        
-        if not available_questions:
+        if HAS_TTS:
+            self.master_app.tts.cancel_speech()  # 前の問題の読み上げが残っていれば取り消す
+
+        # 次に出題する問題（まだ出題していない問題）
+        next_index = len(self.used_questions)
+        remaining = len(self.questions) - next_index
+
+        if remaining <= 0:
             self.english_label.config(text="復習完了！")
             self.japanese_label.config(text=f"復習終了：{self.current_idx - 1} 問取り組み、{self.score} 問正解")
             self.answer_btn.config(state="disabled")
@@ -2328,17 +4395,18 @@ class WrongSentenceQuizWindow(tk.Toplevel):
             self.master_app.update_stats()
             return
 
-        # ランダムに1つ選択
-        q = random.choice(available_questions)
+        # シャッフル済みの順に1つ選択
+        q = self.questions[next_index]
         # 使用済みに追加
-        original_index = self.questions.index(q)
-        self.used_questions.add(original_index)
+        self.used_questions.add(next_index)
+        if self.prefetcher:
+            self.prefetcher.advance(next_index)
         
         self.current_english = q[0]  # 英文
         self.current_japanese = q[1]  # 正解
         self.consecutive_correct = q[2]  # 連続正解数
 
-        self.progress_label.config(text=f"復習中... 残り問題: {len(available_questions)-1} (連続正解: {self.consecutive_correct})")
+        self.progress_label.config(text=f"復習中... 残り問題: {remaining-1} (連続正解: {self.consecutive_correct})")
         self.english_label.config(text=self.current_english)
         self.japanese_label.config(text="（下に日本語訳が表示されます）")
         self.judge_feedback.config(text="")
@@ -2366,66 +4434,33 @@ class WrongSentenceQuizWindow(tk.Toplevel):
         if is_correct:
             self.score += 1
             self.judge_feedback.config(text="✅ 正解として記録しました")
-            sound_file = SOUND_FILES["correct"]
+            sound_name = "correct"
             # データベースの正解カウントを更新
             self.master_app.db.update_wrong_question_score('sentence', self.current_english, True)
         else:
             self.judge_feedback.config(text="❌ 不正解として記録しました")
-            sound_file = SOUND_FILES["incorrect"]
+            sound_name = "incorrect"
             # データベースの正解カウントをリセット
             self.master_app.db.update_wrong_question_score('sentence', self.current_english, False)
 
-        if os.path.exists(sound_file):
-            self._play_sound(sound_file)
+        self.master_app.play_effect(sound_name)
 
         self.correct_btn.config(state="disabled")
         self.wrong_btn.config(state="disabled")
         self.next_btn.config(state="normal")
 
-    def _play_sound(self, sound_path, duration_ms=1500):
-        try:
-            winmm = ctypes.windll.winmm
-            alias = f"se_{random.randint(1000,9999)}"
-            path_abs = os.path.abspath(sound_path)
-            winmm.mciSendStringW(f'open "{path_abs}" type mpegvideo alias {alias}', None, 0, None)
-            winmm.mciSendStringW(f'play {alias}', None, 0, None)
-            self.after(duration_ms, lambda: winmm.mciSendStringW(f'close {alias}', None, 0, None))
-        except Exception as e:
-            print(f"Sound playback error: {e}")
-
-    def _speak_task(self, text):
-        async def _task():
-            try:
-                self.is_speaking = True
-                communicate = edge_tts.Communicate(text, TTS_VOICE)
-                await communicate.save(AUDIO_FILE_PATH)
-                winmm = ctypes.windll.winmm
-                alias = f"speech_{random.randint(1000,9999)}"
-                path_abs = os.path.abspath(AUDIO_FILE_PATH)
-                winmm.mciSendStringW(f'open "{path_abs}" type mpegvideo alias {alias}', None, 0, None)
-                winmm.mciSendStringW(f'play {alias} wait', None, 0, None)
-                winmm.mciSendStringW(f'close {alias}', None, 0, None)
-            except Exception as e:
-                print(f"TTS Error: {e}")
-            finally:
-                self.is_speaking = False
-                if os.path.exists(AUDIO_FILE_PATH):
-                    try:
-                        os.remove(AUDIO_FILE_PATH)
-                    except OSError:
-                        pass
-        try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        loop.run_until_complete(_task())
+    def is_speaking(self):
+        return self.speech_future is not None and not self.speech_future.done()
 
     def speak_current_sentence(self):
-        if HAS_TTS and not self.is_speaking:
-            threading.Thread(target=self._speak_task, args=(self.current_english,), daemon=True).start()
+        if HAS_TTS and not self.is_speaking():
+            self.speech_future = self.master_app.tts.speak(self.current_english)
 
     def on_closing(self):
+        if HAS_TTS:
+            self.master_app.tts.cancel_speech()
+        if self.prefetcher:
+            self.prefetcher.close()
         self.destroy()
 
 
@@ -2437,7 +4472,7 @@ class WordReviewWindow(tk.Toplevel):
         self.items = list(wrong_items)  # [(word, meaning), ...]
         self.total = len(self.items)
         self.idx = 0
-        self.is_speaking = False
+        self.speech_future = None
 
         self.title("復習：間違えた単語")
         self.geometry("700x420")
@@ -2473,6 +4508,9 @@ class WordReviewWindow(tk.Toplevel):
         self.next_btn.pack(side=tk.LEFT, expand=True, padx=5, ipady=5)
 
     def show_item(self):
+        if HAS_TTS:
+            self.master_quiz.master_app.tts.cancel_speech()  # 前の問題の読み上げが残っていれば取り消す
+
         if not self.items:
             self.word.config(text="復習対象はありません。")
             self.meaning.config(text="")
@@ -2501,39 +4539,16 @@ class WordReviewWindow(tk.Toplevel):
         self.show_item()
 
     # --- TTS（読み上げだけ。効果音は無し） ---
-    def _speak_task(self, text):
-        async def _task():
-            try:
-                self.is_speaking = True
-                communicate = edge_tts.Communicate(text, TTS_VOICE)
-                await communicate.save(AUDIO_FILE_PATH)
-                winmm = ctypes.windll.winmm
-                alias = f"rvw_{random.randint(1000,9999)}"
-                path_abs = os.path.abspath(AUDIO_FILE_PATH)
-                winmm.mciSendStringW(f'open "{path_abs}" type mpegvideo alias {alias}', None, 0, None)
-                winmm.mciSendStringW(f'play {alias} wait', None, 0, None)
-                winmm.mciSendStringW(f'close {alias}', None, 0, None)
-            except Exception as e:
-                print(f"TTS Error: {e}")
-            finally:
-                self.is_speaking = False
-                if os.path.exists(AUDIO_FILE_PATH):
-                    try:
-                        os.remove(AUDIO_FILE_PATH)
-                    except OSError:
-                        pass
-        try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        loop.run_until_complete(_task())
+    def is_speaking(self):
+        return self.speech_future is not None and not self.speech_future.done()
 
     def speak(self):
-        if HAS_TTS and not self.is_speaking:
-            threading.Thread(target=self._speak_task, args=(self.current_word,), daemon=True).start()
+        if HAS_TTS and not self.is_speaking():
+            self.speech_future = self.master_quiz.master_app.tts.speak(self.current_word)
 
     def on_close(self):
+        if HAS_TTS:
+            self.master_quiz.master_app.tts.cancel_speech()
         self.destroy()
 
 # --- 復習ウィンドウ（例文：間違いのみを周回） ---
@@ -2544,7 +4559,7 @@ class SentenceReviewWindow(tk.Toplevel):
         self.items = list(wrong_items)  # [(english, japanese)]
         self.total = len(self.items)
         self.idx = 0
-        self.is_speaking = False
+        self.speech_future = None
 
         self.title("復習：間違えた例文")
         self.geometry("760x480")
@@ -2580,6 +4595,9 @@ class SentenceReviewWindow(tk.Toplevel):
         self.next_btn.pack(side=tk.LEFT, expand=True, padx=5, ipady=5)
 
     def show_item(self):
+        if HAS_TTS:
+            self.master_quiz.master_app.tts.cancel_speech()  # 前の問題の読み上げが残っていれば取り消す
+
         if not self.items:
             self.eng.config(text="復習対象はありません。")
             self.ja.config(text="")
@@ -2607,42 +4625,29 @@ class SentenceReviewWindow(tk.Toplevel):
         self.idx += 1
         self.show_item()
 
-    def _speak_task(self, text):
-        async def _task():
-            try:
-                self.is_speaking = True
-                communicate = edge_tts.Communicate(text, TTS_VOICE)
-                await communicate.save(AUDIO_FILE_PATH)
-                winmm = ctypes.windll.winmm
-                alias = f"rvw_{random.randint(1000,9999)}"
-                path_abs = os.path.abspath(AUDIO_FILE_PATH)
-                winmm.mciSendStringW(f'open "{path_abs}" type mpegvideo alias {alias}', None, 0, None)
-                winmm.mciSendStringW(f'play {alias} wait', None, 0, None)
-                winmm.mciSendStringW(f'close {alias}', None, 0, None)
-            except Exception as e:
-                print(f"TTS Error: {e}")
-            finally:
-                self.is_speaking = False
-                if os.path.exists(AUDIO_FILE_PATH):
-                    try:
-                        os.remove(AUDIO_FILE_PATH)
-                    except OSError:
-                        pass
-        try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        loop.run_until_complete(_task())
+    def is_speaking(self):
+        return self.speech_future is not None and not self.speech_future.done()
 
     def speak(self):
-        if HAS_TTS and not self.is_speaking:
-            threading.Thread(target=self._speak_task, args=(self.current_english,), daemon=True).start()
+        if HAS_TTS and not self.is_speaking():
+            self.speech_future = self.master_quiz.master_app.tts.speak(self.current_english)
 
     def on_close(self):
+        if HAS_TTS:
+            self.master_quiz.master_app.tts.cancel_speech()
         self.destroy()
 
 # --- ヘルパー関数 ---
+def find_resource(filename):
+    """カレントディレクトリ、実行ファイル（PyInstaller）のフォルダ、スクリプトのフォルダの順に探す"""
+    candidates = [filename,
+                  os.path.join(getattr(sys, "_MEIPASS", ""), filename),
+                  os.path.join(os.path.abspath(os.path.dirname(__file__)), filename)]
+    for path in candidates:
+        if os.path.exists(path):
+            return path
+    return None
+
 def load_config():
     if not os.path.exists(CONFIG_FILE):
         return {}
@@ -2656,7 +4661,153 @@ def save_config(config_data):
     with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
         json.dump(config_data, f, indent=2)
 
+def format_cache_overflow(deck_bytes, max_bytes):
+    """一括作成した音声がキャッシュの上限を超えたときの警告文"""
+    return (f"作成した音声（{deck_bytes / 1024 / 1024:.0f}MB）が音声キャッシュの上限（{max_bytes / 1024 / 1024:.0f}MB）を超えています。\n"
+            "次に音声を作成したときに古いものから削除されます。すべて残すには TTS_CACHE_MAX_BYTES を増やしてください。")
+
+def prerender_audio_cli(args):
+    """コマンドラインから読み上げ音声を一括作成"""
+    if not HAS_TTS:
+        print("edge-ttsライブラリがインストールされていません。pip install edge-tts を実行してください。")
+        return 1
+
+    config_data = load_config()
+    db = DatabaseManager(config_data.get("db_path", DEFAULT_DB_FILE))
+    try:
+        texts = list(db.iter_tts_texts(args.start, args.end))
+    finally:
+        db.close()
+
+    def on_progress(done, total, failed):
+        print(f"\r作成中... {done} / {total}（失敗: {failed}）", end="", flush=True)
+
+    cache = TTSAudioCache()
+    result = asyncio.run(cache.prerender(texts, concurrency=args.concurrency, progress=on_progress))
+    print()
+    if result["deck_bytes"] > cache.max_bytes:
+        print(format_cache_overflow(result["deck_bytes"], cache.max_bytes))
+    return 1 if result["failed"] else 0
+
+def _open_export_file(path, fmt, compress):
+    """書き出し先を開く（gzip 圧縮に対応、CSV は Excel で開けるよう BOM 付き）"""
+    encoding = "utf-8-sig" if fmt == "csv" else "utf-8"
+    if compress:
+        return gzip.open(path, "wt", encoding=encoding, newline="")
+    return open(path, "w", encoding=encoding, newline="")
+
+def export_table(db, table, path, fmt="csv", start_date=None, end_date=None):
+    """1つのテーブルを CSV / JSONL に書き出して件数を返す（.gz なら圧縮。途中で失敗しても既存ファイルは壊さない）"""
+    columns = EXPORT_TABLES[table]
+    tmp_path = path + ".part"
+    count = 0
+    try:
+        with _open_export_file(tmp_path, fmt, path.endswith(".gz")) as f:
+            if fmt == "csv":
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                for row in db.iter_export_rows(table, start_date, end_date):
+                    writer.writerow(row)
+                    count += 1
+            else:
+                for row in db.iter_export_rows(table, start_date, end_date):
+                    f.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n")
+                    count += 1
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return count
+
+def export_deck(db, out_dir, fmt="csv", compress=False, start_date=None, end_date=None, tables=tuple(EXPORT_TABLES)):
+    """単語・例文・間違えた問題をテーブルごとのファイルに書き出す。{テーブル名: (パス, 件数)} を返す"""
+    os.makedirs(out_dir, exist_ok=True)
+    results = {}
+    for table in tables:
+        path = os.path.join(out_dir, f"{table}.{fmt}" + (".gz" if compress else ""))
+        results[table] = (path, export_table(db, table, path, fmt, start_date, end_date))
+    return results
+
+def export_cli(args):
+    """コマンドラインから単語・例文・間違えた問題をエクスポート"""
+    config_data = load_config()
+    db = DatabaseManager(config_data.get("db_path", DEFAULT_DB_FILE))
+    try:
+        results = export_deck(db, args.export_dir, args.format, args.gzip, args.start, args.end)
+    except (OSError, sqlite3.Error) as e:
+        print(f"エクスポートに失敗しました: {e}")
+        return 1
+    finally:
+        db.close()
+    for path, count in results.values():
+        print(f"{path}: {count}件")
+    return 0
+
+def format_import_result(label, result):
+    """インポート結果の表示用テキスト"""
+    lines = [f"{label}のインポート: 追加 {result.added}件　更新 {result.updated}件　"
+             f"変更なし {result.unchanged}件　スキップ {result.skipped}件"]
+    if result.conflicts:
+        lines.append("訳が異なっていたため上書きしたもの（例）:")
+        lines.extend(f"  {english}: {old} → {new}" for english, old, new in result.conflicts[:5])
+    return "\n".join(lines)
+
+def import_cli(args):
+    """コマンドラインから単語・例文をインポート"""
+    config_data = load_config()
+    db = DatabaseManager(config_data.get("db_path", DEFAULT_DB_FILE))
+    label = "単語" if args.kind == "words" else "例文"
+    try:
+        result = db.import_rows(args.kind, iter_import_rows(args.import_file), int(datetime.now().timestamp()))
+    except (OSError, UnicodeDecodeError, csv.Error, sqlite3.Error) as e:
+        print(f"インポートに失敗しました: {e}")
+        return 1
+    finally:
+        db.close()
+    print(format_import_result(label, result))
+    return 0
+
+def check_db_cli(args):
+    """データベースの主な問い合わせがインデックスを使っているか確認"""
+    config_data = load_config()
+    db = DatabaseManager(config_data.get("db_path", DEFAULT_DB_FILE))
+    try:
+        results = db.check_query_plans()
+    finally:
+        db.close()
+    for label, plan, ok in results:
+        print(f"[{'OK' if ok else 'NG'}] {label}: {plan}")
+    return 0 if all(ok for _, _, ok in results) else 1
+
+def parse_date_arg(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=APP_TITLE)
+    parser.add_argument("--prerender-audio", action="store_true", help="単語・例文の読み上げ音声を一括作成して終了")
+    parser.add_argument("--start", type=parse_date_arg, help="対象の開始日 (YYYY-MM-DD)")
+    parser.add_argument("--end", type=parse_date_arg, help="対象の終了日 (YYYY-MM-DD)")
+    parser.add_argument("--concurrency", type=int, default=TTS_PRERENDER_CONCURRENCY, help="同時に合成する数")
+    parser.add_argument("--import", dest="import_file", metavar="FILE", help="CSV/TSV/Anki の書き出しファイルをインポートして終了")
+    parser.add_argument("--kind", choices=["words", "sentences"], default="words", help="インポート先（words / sentences）")
+    parser.add_argument("--export", dest="export_dir", metavar="DIR", help="単語・例文・間違えた問題をフォルダに書き出して終了（--start/--end で絞り込み）")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv", help="エクスポートの形式（csv / jsonl）")
+    parser.add_argument("--gzip", action="store_true", help="エクスポートを gzip で圧縮")
+    parser.add_argument("--check-db", action="store_true", help="主な問い合わせがインデックスを使っているか確認して終了")
+    return parser.parse_args(argv)
+
 def main():
+    args = parse_args()
+    if args.prerender_audio:
+        sys.exit(prerender_audio_cli(args))
+    if args.import_file:
+        sys.exit(import_cli(args))
+    if args.export_dir:
+        sys.exit(export_cli(args))
+    if args.check_db:
+        sys.exit(check_db_cli(args))
+
     try:
         config_data = load_config()
         app = App(config_data)
@@ -0,0 +1,106 @@
+"""normalize_english_key と移行 6（english_key の追加と重複のまとめ）を確認する"""
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import integrated_learning_app
+from integrated_learning_app import DatabaseManager, normalize_english_key
+
+
+class NormalizeEnglishKeyTest(unittest.TestCase):
+    def test_case_width_and_spaces_are_ignored(self):
+        self.assertEqual(normalize_english_key("  Look   UP "), "look up")
+        self.assertEqual(normalize_english_key("Ｃ＋＋"), "c++")
+
+    def test_quotes_brackets_and_final_period_are_ignored(self):
+        self.assertEqual(normalize_english_key('"Hello."'), "hello")
+        self.assertEqual(normalize_english_key("(apple)"), "apple")
+        self.assertEqual(normalize_english_key("I see."), "i see")
+
+    def test_meaningful_symbols_are_kept(self):
+        keys = {normalize_english_key(text) for text in ["C++", "C#", "C", "-ish", "ish", "Hi?", "Hi!"]}
+        self.assertEqual(len(keys), 7)
+
+
+class MergeDuplicatesMigrationTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "test.sqlite3")
+        # english_key が入る前（版 5）のデータベースを作る
+        old = DatabaseManager.__new__(DatabaseManager)
+        old.conn = sqlite3.connect(self.path)
+        old.create_tables()
+        with old.conn:
+            for statements in DatabaseManager.MIGRATIONS[:5]:
+                for statement in statements:
+                    if callable(statement):
+                        statement(old.conn)
+                    else:
+                        old.conn.execute(statement)
+            old.conn.execute("PRAGMA user_version = 5")
+            old.conn.executemany(
+                "INSERT INTO words (english_word, japanese_meaning, created_at) VALUES (?, ?, ?)",
+                [("C++", "シープラスプラス", 1), ("C", "シー", 2), ("C#", "シーシャープ", 3),
+                 ("apple", "りんご", 4), ("Apple ", "林檎", 5), ('"apple"', "リンゴ", 6),
+                 ("Hello.", "こんにちは。", 7), ("hello", "こんにちは", 8)])
+        old.conn.close()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_only_case_and_space_variants_are_merged(self):
+        db = DatabaseManager(self.path)
+        try:
+            rows = db.conn.execute("SELECT english_word, japanese_meaning, english_key FROM words ORDER BY id").fetchall()
+        finally:
+            db.close()
+        self.assertEqual(rows, [
+            ("C++", "シープラスプラス", "c++"),
+            ("C", "シー", "c"),
+            ("C#", "シーシャープ", "c#"),
+            ("apple", "りんご; 林檎", "apple"),
+            ('"apple"', "リンゴ", "apple\n6"),
+            ("Hello.", "こんにちは。", "hello"),
+            ("hello", "こんにちは", "hello\n8"),
+        ])
+
+    def test_kept_rows_can_be_saved_and_edited(self):
+        db = DatabaseManager(self.path)
+        try:
+            row, added = db.save_word("hello", "やあ", 9)
+            self.assertEqual((row, added), ((8, "hello", "やあ"), False))
+            self.assertEqual(db.update_word(6, '"apple"', "りんご（引用）"), (6, '"apple"', "りんご（引用）"))
+            for english, japanese in [("hello", "どうも"), ("Hello.", "こんにちは！")]:
+                result = db.import_rows("words", [(english, japanese)], 10)
+                self.assertEqual((result.added, result.updated), (0, 1))
+            rows = db.conn.execute("SELECT id, english_word, japanese_meaning FROM words WHERE id IN (7, 8) ORDER BY id").fetchall()
+            self.assertEqual(rows, [(7, "Hello.", "こんにちは！"), (8, "hello", "どうも")])
+        finally:
+            db.close()
+
+    def test_failed_migration_is_rolled_back(self):
+        with mock.patch.object(integrated_learning_app, "merge_english_duplicates", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                DatabaseManager(self.path)
+        conn = sqlite3.connect(self.path)
+        try:
+            self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], 5)
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(words)")]
+            self.assertNotIn("english_key", columns)
+        finally:
+            conn.close()
+        # 次の起動では最初からやり直せる
+        db = DatabaseManager(self.path)
+        try:
+            self.assertEqual(db.conn.execute("SELECT count(*) FROM words").fetchone()[0], 7)
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
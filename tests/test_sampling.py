@@ -0,0 +1,55 @@
+"""DatabaseManager._sample_ids の無作為抽出の偏りを確認する"""
+import os
+import random
+import sys
+import tempfile
+import unittest
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from integrated_learning_app import DatabaseManager
+
+
+class SampleIdsTest(unittest.TestCase):
+    def setUp(self):
+        random.seed(1234)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(os.path.join(self.tmpdir.name, "test.sqlite3"))
+        with self.db.conn:
+            self.db.conn.executemany(
+                "INSERT INTO words (english_word, japanese_meaning, english_key, created_at) VALUES (?, ?, ?, ?)",
+                [(f"word{i}", f"意味{i}", f"word{i}", i) for i in range(300)])
+
+    def tearDown(self):
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def test_every_row_is_picked_about_equally(self):
+        draws, k = 3000, 20
+        counts = Counter()
+        for _ in range(draws):
+            ids = self.db._sample_ids("words", k)
+            self.assertEqual(len(ids), k)
+            self.assertEqual(len(set(ids)), k)
+            counts.update(ids)
+        expected = draws * k / 300  # 200
+        self.assertEqual(len(counts), 300)
+        self.assertGreater(min(counts.values()), expected * 0.6)
+        self.assertLess(max(counts.values()), expected * 1.4)
+
+    def test_order_is_shuffled(self):
+        in_order = sum(ids == sorted(ids) for ids in (self.db._sample_ids("words", 20) for _ in range(200)))
+        self.assertLess(in_order, 5)
+
+    def test_condition_is_respected(self):
+        counts = Counter()
+        for _ in range(1000):
+            counts.update(self.db._sample_ids("words", 10, " AND created_at >= ?", (150,)))
+        self.assertEqual(len(counts), 150)
+        self.assertTrue(all(150 < word_id <= 300 for word_id in counts))
+        self.assertGreater(min(counts.values()), 1000 * 10 / 150 * 0.6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+"""DatabaseManager.search_list の英語・日本語の振り分けを確認する"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from integrated_learning_app import DatabaseManager
+
+
+class SearchListTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(os.path.join(self.tmpdir.name, "test.sqlite3"))
+        if not self.db.has_search:
+            self.db.close()
+            self.tmpdir.cleanup()
+            self.skipTest("この SQLite では FTS5 の trigram が使えない")
+        self.db.import_rows("words", [("café", "喫茶店"), ("naïve", "世間知らずな"), ("apple", "りんご"),
+                                      ("apple pie", "アップルパイ"), ("discount", "50%オフ"), ("sale", "50オフ")], 1)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def english(self, text):
+        return [row[1] for row in self.db.search_list("words", text)]
+
+    def test_accented_english_is_searched_in_english(self):
+        self.assertEqual(self.english("café"), ["café"])
+        self.assertEqual(self.english("naïve"), ["naïve"])
+        self.assertEqual(self.english("cafe"), ["café"])
+
+    def test_mixed_query_matches_both_languages(self):
+        self.assertEqual(self.english("apple りんご"), ["apple"])
+        self.assertEqual(self.english("app パイ"), ["apple pie"])
+
+    def test_like_wildcards_are_literal(self):
+        self.assertEqual(self.english("%オ"), ["discount"])
+
+
+if __name__ == "__main__":
+    unittest.main()